@@ -2,15 +2,40 @@
 
 import json
 import os
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass, field
-from typing import Dict, List, Literal
+from pathlib import Path
+from typing import Callable, Dict, List, Literal, Optional, get_args
 
-from anthropic import Anthropic
+import numpy as np
+from anthropic import Anthropic, Timeout
 
+from .cache import SemanticCache
 from .transcriber import Segment, TranscriptResult, WordSegment
 
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+except ImportError:  # orjson 為選用相依套件
+    _json_loads = json.loads
+
 
 RemovalReason = Literal["filler", "repeat", "restart", "mouth_noise", "long_pause"]
+REMOVAL_REASONS = get_args(RemovalReason)
+
+# 可能是語氣詞的單詞，用於決定是否附上單詞級時間戳
+FILLER_WORDS = frozenset({
+    "嗯", "啊", "呃", "欸", "那個", "就是", "就是說", "對對對", "然後", "所以說",
+    "um", "uh", "like", "so", "basically", "actually",
+})
+
+# 單詞間隔超過此值（秒）時附上單詞級時間戳
+WORD_GAP_THRESHOLD = 0.5
+
+# 擷取 markdown code block 中的 JSON 物件
+_FENCE_RE = re.compile(r"```(?:json)?\s*(\{.*?\})\s*```", re.DOTALL)
 
 
 @dataclass
@@ -33,6 +58,23 @@ class Removal:
         }
 
 
+def removals_to_arrays(removals: List[Removal]) -> Dict[str, np.ndarray]:
+    """將 Removal 列表轉為欄位陣列 (SoA)，供向量化運算使用
+
+    Returns:
+        {"start", "end", "confidence", "reason"} 對應的 NumPy 陣列
+    """
+    n = len(removals)
+    return {
+        "start": np.fromiter((r.start for r in removals), dtype=np.float64, count=n),
+        "end": np.fromiter((r.end for r in removals), dtype=np.float64, count=n),
+        "confidence": np.fromiter(
+            (r.confidence for r in removals), dtype=np.float64, count=n
+        ),
+        "reason": np.array([r.reason for r in removals], dtype=object),
+    }
+
+
 @dataclass
 class AnalysisResult:
     """分析結果"""
@@ -50,6 +92,10 @@ class AnalysisResult:
             "statistics": self.statistics,
         }
 
+    def as_arrays(self) -> Dict[str, np.ndarray]:
+        """以欄位陣列形式取得移除區間"""
+        return removals_to_arrays(self.removals)
+
 
 ANALYSIS_PROMPT = """你是一個專業的 Podcast 剪輯助理。分析以下逐字稿，標記需要移除的區間。
 
@@ -81,17 +127,17 @@ ANALYSIS_PROMPT = """你是一個專業的 Podcast 剪輯助理。分析以下
 請以 JSON 格式輸出，包含 removals 陣列：
 
 ```json
-{
+{{
   "removals": [
-    {
+    {{
       "start": 1.23,
       "end": 1.56,
       "reason": "filler",
       "text": "嗯",
       "confidence": 0.95
-    }
+    }}
   ]
-}
+}}
 ```
 
 ## 注意事項
@@ -109,6 +155,84 @@ ANALYSIS_PROMPT = """你是一個專業的 Podcast 剪輯助理。分析以下
 請分析以上逐字稿，輸出 JSON 格式的移除區間。只輸出 JSON，不要有其他說明。"""
 
 
+@dataclass
+class _Chunk:
+    """逐字稿分段（含預先格式化的文字與估計 token 數）"""
+    segments: List[Segment]
+    text: str
+    tokens: int
+
+
+class _RemovalStreamParser:
+    """增量 JSON 解析器
+
+    追蹤串流文字中 "removals" 陣列的大括號深度，
+    每當一個完整的 {...} 物件出現就立即解析回傳。
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._obj_start = 0
+        self._in_string = False
+        self._escape = False
+        self._done = False
+        self.found = False
+
+    @property
+    def text(self) -> str:
+        """目前收到的完整文字"""
+        return self._buffer
+
+    def feed(self, text: str) -> List[dict]:
+        """加入新的文字片段，回傳本次新完成的物件"""
+        self._buffer += text
+        if self._done:
+            return []
+
+        if not self.found:
+            key = self._buffer.find('"removals"')
+            bracket = self._buffer.find("[", key) if key >= 0 else -1
+            if bracket < 0:
+                return []
+            self.found = True
+            self._pos = bracket + 1
+
+        items = []
+        buf = self._buffer
+        i = self._pos
+        while i < len(buf):
+            ch = buf[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch == "{":
+                if self._depth == 0:
+                    self._obj_start = i
+                self._depth += 1
+            elif ch == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    try:
+                        items.append(_json_loads(buf[self._obj_start:i + 1]))
+                    except json.JSONDecodeError:
+                        pass
+            elif ch == "]" and self._depth == 0:
+                self._done = True
+                break
+            i += 1
+
+        self._pos = i
+        return items
+
+
 class Analyzer:
     """LLM 分析引擎
 
@@ -120,7 +244,12 @@ class Analyzer:
         api_key: str = None,
         model: str = "claude-sonnet-4-20250514",
         max_segment_duration: float = 300.0,  # 5 分鐘
-        min_confidence: float = 0.7
+        min_confidence: float = 0.7,
+        max_parallel_requests: int = 4,
+        stall_timeout: float = 30.0,
+        cache_dir: Optional[Path] = None,
+        max_tokens_per_request: int = 8000,
+        include_words: bool = False
     ):
         """
         初始化分析器
@@ -130,6 +259,12 @@ class Analyzer:
             model: Claude 模型名稱
             max_segment_duration: 每次分析的最大時長（秒）
             min_confidence: 最低信心閾值
+            max_parallel_requests: 同時送出的 API 請求上限（受 rate limit 限制）
+            stall_timeout: 串流回應停滯的最長等待時間（秒），超過即中止
+            cache_dir: 語意快取目錄，None 表示不使用快取
+            max_tokens_per_request: 單次請求的輸入 token 上限（估計值，含 prompt），
+                用於限制每個 chunk 的大小
+            include_words: 是否在可疑段落（含語氣詞或長間隔）附上單詞級時間戳
         """
         self.api_key = api_key or os.getenv("ANTHROPIC_API_KEY")
         if not self.api_key:
@@ -142,6 +277,16 @@ class Analyzer:
         self.model = model
         self.max_segment_duration = max_segment_duration
         self.min_confidence = min_confidence
+        self.max_parallel_requests = max(1, max_parallel_requests)
+        # read timeout 套用在每次讀取串流資料，等同於停滯偵測
+        self._stream_timeout = Timeout(stall_timeout, connect=10.0)
+        self.cache = SemanticCache(cache_dir) if cache_dir else None
+        self.max_tokens_per_request = max_tokens_per_request
+        # prompt 本身的 token 數只需估計一次，剩餘額度留給逐字稿
+        self._transcript_budget = max(
+            1, max_tokens_per_request - self._estimate_tokens(ANALYSIS_PROMPT)
+        )
+        self.include_words = include_words
 
     def analyze(self, transcript: TranscriptResult) -> AnalysisResult:
         """
@@ -153,97 +298,239 @@ class Analyzer:
         Returns:
             AnalysisResult
         """
-        all_removals = []
-
         # 分段處理
         chunks = self._chunk_transcript(transcript)
 
-        for chunk in chunks:
-            removals = self._call_llm(chunk)
-            all_removals.extend(removals)
-
-        # 過濾低信心的移除
-        filtered_removals = [
-            r for r in all_removals
-            if r.confidence >= self.min_confidence
-        ]
-
-        # 計算統計
-        removed_duration = sum(r.end - r.start for r in filtered_removals)
-        statistics = self._compute_statistics(filtered_removals)
-
-        return AnalysisResult(
-            removals=filtered_removals,
-            original_duration=transcript.duration,
-            removed_duration=removed_duration,
-            statistics=statistics
+        return self._build_result(
+            self._analyze_chunks(chunks), transcript.duration
         )
 
     def _chunk_transcript(
         self,
         transcript: TranscriptResult
-    ) -> List[List[Segment]]:
+    ) -> List[_Chunk]:
         """將逐字稿分段處理
 
+        每個段落只格式化一次，chunk 的文字直接由格式化結果切片串接。
+        chunk 在超過最大時長，或估計 token 數將超過單次請求額度時結束。
+
         Args:
             transcript: 轉錄結果
 
         Returns:
-            分段後的 segments 列表
+            分段後的 chunk 列表
         """
+        segments = transcript.segments
+        formatted = [self._format_segment(seg) for seg in segments]
+
         chunks = []
-        current_chunk = []
+        lo = 0
+        current_tokens = 0
         chunk_start = 0.0
 
-        for segment in transcript.segments:
-            current_chunk.append(segment)
+        def close(hi: int) -> None:
+            chunks.append(_Chunk(
+                segments=segments[lo:hi],
+                text="\n".join(formatted[lo:hi]),
+                tokens=current_tokens
+            ))
+
+        for i, segment in enumerate(segments):
+            # 加入此段會超過 token 額度時，先結束目前的 chunk
+            tokens = self._estimate_tokens(formatted[i]) + 1
+            if i > lo and current_tokens + tokens > self._transcript_budget:
+                close(i)
+                lo = i
+                current_tokens = 0
+                chunk_start = segments[i - 1].end
+
+            current_tokens += tokens
 
             # 檢查是否超過最大時長
             chunk_duration = segment.end - chunk_start
             if chunk_duration >= self.max_segment_duration:
-                chunks.append(current_chunk)
-                current_chunk = []
+                close(i + 1)
+                lo = i + 1
+                current_tokens = 0
                 chunk_start = segment.end
 
         # 加入最後一個 chunk
-        if current_chunk:
-            chunks.append(current_chunk)
+        if lo < len(segments):
+            close(len(segments))
 
         return chunks
 
-    def _format_transcript(self, segments: List[Segment]) -> str:
-        """格式化逐字稿供 LLM 分析"""
-        lines = []
-        for seg in segments:
-            speaker = f"({seg.speaker})" if seg.speaker else ""
-            line = f"[{seg.start:.2f}-{seg.end:.2f}] {speaker} {seg.text}"
-            lines.append(line)
-
-            # 加入單詞級別的詳細資訊
-            if seg.words:
-                word_details = []
-                for w in seg.words:
-                    word_details.append(f"  [{w.start:.2f}-{w.end:.2f}] {w.word}")
-                lines.extend(word_details)
-
-        return "\n".join(lines)
-
-    def _call_llm(self, segments: List[Segment]) -> List[Removal]:
-        """呼叫 Claude API"""
-        transcript_text = self._format_transcript(segments)
-        prompt = self._get_prompt(transcript_text)
-
-        message = self.client.messages.create(
+    def _format_segment(self, seg: Segment) -> str:
+        """格式化單一段落（必要時附上單詞級時間戳）"""
+        speaker = f"({seg.speaker})" if seg.speaker else ""
+        line = f"[{seg.start:.2f}-{seg.end:.2f}] {speaker} {seg.text}"
+
+        # 只在可疑段落加入單詞級別的詳細資訊
+        if self.include_words and self._needs_word_detail(seg.words):
+            words = "\n".join(f"  [{w.start:.2f}-{w.end:.2f}] {w.word}" for w in seg.words)
+            return f"{line}\n{words}"
+
+        return line
+
+    @staticmethod
+    def _needs_word_detail(words: List[WordSegment]) -> bool:
+        """段落是否含有語氣詞候選或過長的單詞間隔"""
+        prev_end = None
+        for w in words:
+            if w.word.strip().lower().strip(",.?!，。？！") in FILLER_WORDS:
+                return True
+            if prev_end is not None and w.start - prev_end >= WORD_GAP_THRESHOLD:
+                return True
+            prev_end = w.end
+        return False
+
+    def _analyze_chunks(
+        self,
+        chunks: List[_Chunk],
+        progress_callback: Optional[Callable[[int, int], None]] = None
+    ) -> List[List[Removal]]:
+        """分析所有 chunk，回傳與 chunks 對應的移除區間
+
+        先查詢語意快取，未命中的 chunk 各自並行送出 API 請求。
+
+        Args:
+            chunks: 分段後的 chunk 列表
+            progress_callback: 進度回調函數 (已完成 chunk 數, 總數)
+
+        Returns:
+            每個 chunk 的移除區間列表
+        """
+        total = len(chunks)
+        results = self._cache_get_many(chunks)
+        done = sum(r is not None for r in results)
+
+        if progress_callback:
+            progress_callback(done, total)
+
+        pending = [i for i, r in enumerate(results) if r is None]
+
+        if pending:
+            workers = min(self.max_parallel_requests, len(pending))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    executor.submit(self._call_llm, chunks[i]): i for i in pending
+                }
+                # 依完成順序回報進度，結果依 index 放回原位
+                for future in as_completed(futures):
+                    i = futures[future]
+                    results[i] = future.result()
+                    self._cache_put(chunks[i].segments, results[i])
+
+                    done += 1
+                    if progress_callback:
+                        progress_callback(done, total)
+
+        if self.cache:
+            self.cache.save()
+
+        return results
+
+    @staticmethod
+    def _estimate_tokens(text: str) -> int:
+        """粗估 token 數（UTF-8 位元組數 / 3，中文約一字一 token）"""
+        return len(text.encode("utf-8")) // 3 + 1
+
+    def _cache_get_many(
+        self,
+        chunks: List[_Chunk]
+    ) -> List[Optional[List[Removal]]]:
+        """批次查詢語意快取
+
+        快取中的時間戳以 chunk 起點為基準儲存，命中時再平移回絕對時間，
+        讓同一段內容在不同位置（例如重新剪輯後的版本）也能重用。
+        僅向量相似的命中內容可能有增刪，平移後的每個移除區間都必須
+        對得上該時間的逐字稿文字，否則（包括沒有任何移除區間可供驗證）
+        整個 chunk 視為未命中。
+        """
+        if self.cache is None:
+            return [None] * len(chunks)
+
+        lookup = [i for i, chunk in enumerate(chunks) if chunk.segments]
+        matches = self.cache.match_many(
+            [self._canonical_text(chunks[i].segments) for i in lookup]
+        )
+
+        results: List[Optional[List[Removal]]] = [None] * len(chunks)
+        for i, match in zip(lookup, matches):
+            if match is None:
+                continue
+            items, exact = match
+            segments = chunks[i].segments
+            offset = segments[0].start
+            removals = [
+                Removal(**{**item, "start": item["start"] + offset, "end": item["end"] + offset})
+                for item in items
+            ]
+            # 空列表無從驗證，近似命中時視為未命中
+            if exact or (
+                removals and all(self._removal_matches(r, segments) for r in removals)
+            ):
+                results[i] = removals
+
+        return results
+
+    @staticmethod
+    def _removal_matches(removal: Removal, segments: List[Segment]) -> bool:
+        """確認移除區間的文字出現在該時間範圍的逐字稿中"""
+        target = "".join(removal.text.split())
+        if not target:
+            return False
+
+        spoken = "".join(
+            "".join(seg.text.split())
+            for seg in segments
+            if seg.start < removal.end and seg.end > removal.start
+        )
+        return target in spoken
+
+    def _cache_put(self, segments: List[Segment], removals: List[Removal]) -> None:
+        """寫入語意快取（時間戳轉為相對 chunk 起點）"""
+        if self.cache is None or not segments:
+            return
+
+        offset = segments[0].start
+        self.cache.put(self._canonical_text(segments), [
+            {**r.to_dict(), "start": r.start - offset, "end": r.end - offset}
+            for r in removals
+        ])
+
+    @staticmethod
+    def _canonical_text(segments: List[Segment]) -> str:
+        """產生快取用的正規化文字（不含時間戳）"""
+        return "\n".join(seg.text.strip() for seg in segments)
+
+    def _call_llm(self, chunk: _Chunk) -> List[Removal]:
+        """呼叫 Claude API（串流），邊接收邊解析移除區間"""
+        prompt = self._get_prompt(chunk.text)
+
+        parser = _RemovalStreamParser()
+        removals = []
+
+        with self.client.messages.stream(
             model=self.model,
             max_tokens=4096,
             messages=[
                 {"role": "user", "content": prompt}
-            ]
-        )
+            ],
+            timeout=self._stream_timeout
+        ) as stream:
+            for text in stream.text_stream:
+                for item in parser.feed(text):
+                    try:
+                        removals.append(self._make_removal(item))
+                    except (KeyError, TypeError, ValueError):
+                        continue
+
+        # 回應格式不符預期時，改用完整文字解析
+        if not parser.found:
+            return self._parse_response(parser.text)
 
-        # 解析回應
-        response_text = message.content[0].text
-        return self._parse_response(response_text)
+        return removals
 
     def _get_prompt(self, transcript_text: str) -> str:
         """產生 prompt"""
@@ -252,53 +539,69 @@ class Analyzer:
     def _parse_response(self, response: str) -> List[Removal]:
         """解析 LLM 回應"""
         removals = []
+        make_removal = self._make_removal
 
         try:
             # 嘗試提取 JSON
             # 處理可能包含 markdown code block 的情況
-            json_str = response
-            if "```json" in response:
-                start = response.find("```json") + 7
-                end = response.find("```", start)
-                json_str = response[start:end].strip()
-            elif "```" in response:
-                start = response.find("```") + 3
-                end = response.find("```", start)
-                json_str = response[start:end].strip()
-
-            data = json.loads(json_str)
+            match = _FENCE_RE.search(response)
+            json_str = match.group(1) if match else response.strip()
+
+            data = _json_loads(json_str)
 
             for item in data.get("removals", []):
-                removal = Removal(
-                    start=float(item["start"]),
-                    end=float(item["end"]),
-                    reason=item["reason"],
-                    text=item.get("text", ""),
-                    confidence=float(item.get("confidence", 0.9))
-                )
-                removals.append(removal)
-
-        except (json.JSONDecodeError, KeyError, ValueError) as e:
+                removals.append(make_removal(item))
+
+        except (json.JSONDecodeError, AttributeError, KeyError, TypeError, ValueError):
             # 解析失敗，返回空列表
             pass
 
         return removals
 
-    def _compute_statistics(self, removals: List[Removal]) -> Dict[str, int]:
-        """計算移除統計"""
-        stats: Dict[str, int] = {
-            "filler": 0,
-            "repeat": 0,
-            "restart": 0,
-            "mouth_noise": 0,
-            "long_pause": 0,
-        }
+    @staticmethod
+    def _make_removal(item: dict) -> Removal:
+        """將 JSON 物件轉換為 Removal"""
+        return Removal(
+            start=float(item["start"]),
+            end=float(item["end"]),
+            reason=item["reason"],
+            text=item.get("text", ""),
+            confidence=float(item.get("confidence", 0.9))
+        )
+
+    def _build_result(
+        self,
+        chunk_removals: List[List[Removal]],
+        duration: float
+    ) -> AnalysisResult:
+        """過濾低信心的移除並計算統計（單次掃描）
 
-        for removal in removals:
-            if removal.reason in stats:
-                stats[removal.reason] += 1
+        Args:
+            chunk_removals: 每個 chunk 的移除區間
+            duration: 原始長度（秒）
 
-        return stats
+        Returns:
+            AnalysisResult
+        """
+        min_confidence = self.min_confidence
+        filtered = []
+        removed_duration = 0.0
+        stats: Dict[str, int] = dict.fromkeys(REMOVAL_REASONS, 0)
+
+        for removals in chunk_removals:
+            for r in removals:
+                if r.confidence < min_confidence:
+                    continue
+                filtered.append(r)
+                removed_duration += r.end - r.start
+                stats[r.reason] = stats.get(r.reason, 0) + 1
+
+        return AnalysisResult(
+            removals=filtered,
+            original_duration=duration,
+            removed_duration=removed_duration,
+            statistics=stats
+        )
 
     def analyze_with_progress(
         self,
@@ -315,32 +618,8 @@ class Analyzer:
         Returns:
             AnalysisResult
         """
-        all_removals = []
-
         chunks = self._chunk_transcript(transcript)
-        total = len(chunks)
-
-        for i, chunk in enumerate(chunks):
-            if progress_callback:
-                progress_callback(i, total)
-
-            removals = self._call_llm(chunk)
-            all_removals.extend(removals)
 
-        if progress_callback:
-            progress_callback(total, total)
-
-        # 過濾與統計
-        filtered_removals = [
-            r for r in all_removals
-            if r.confidence >= self.min_confidence
-        ]
-        removed_duration = sum(r.end - r.start for r in filtered_removals)
-        statistics = self._compute_statistics(filtered_removals)
-
-        return AnalysisResult(
-            removals=filtered_removals,
-            original_duration=transcript.duration,
-            removed_duration=removed_duration,
-            statistics=statistics
+        return self._build_result(
+            self._analyze_chunks(chunks, progress_callback), transcript.duration
         )
@@ -0,0 +1,210 @@
+"""語意快取 - 以逐字稿內容的向量相似度重用 LLM 分析結果"""
+
+import hashlib
+import json
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class SemanticCache:
+    """語意快取
+
+    以 sentence embedding 作為 key，餘弦相似度超過閾值即視為命中。
+    適用於重複分析同一集（或小幅修改後）的逐字稿。
+    """
+
+    ENTRIES_FILE = "entries.json"
+    EMBEDDINGS_FILE = "embeddings.npy"
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
+        threshold: float = 0.92
+    ):
+        """
+        初始化快取
+
+        Args:
+            cache_dir: 快取目錄
+            model_name: sentence-transformers 模型名稱
+            threshold: 視為命中的最低餘弦相似度
+        """
+        self.cache_dir = Path(cache_dir)
+        self.model_name = model_name
+        self.threshold = threshold
+
+        self._model = None
+        self._lock = threading.Lock()
+        self._model_lock = threading.Lock()
+        self._keys: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._values: List[list] = []
+        self._embeddings: Optional[np.ndarray] = None
+        self._pending: Dict[str, np.ndarray] = {}
+        self._dirty = False
+
+        self._load()
+
+    def _load_model(self):
+        """延遲載入 embedding 模型"""
+        with self._model_lock:
+            if self._model is None:
+                from sentence_transformers import SentenceTransformer
+
+                self._model = SentenceTransformer(self.model_name)
+
+    def _load(self):
+        """從快取目錄載入既有資料"""
+        entries_path = self.cache_dir / self.ENTRIES_FILE
+        embeddings_path = self.cache_dir / self.EMBEDDINGS_FILE
+        if not entries_path.exists() or not embeddings_path.exists():
+            return
+
+        entries = json.loads(entries_path.read_text(encoding="utf-8"))
+        embeddings = np.load(embeddings_path)
+        if len(entries) != len(embeddings):
+            # 檔案不一致，視為空快取
+            return
+
+        self._keys = [e["key"] for e in entries]
+        self._index = {k: i for i, k in enumerate(self._keys)}
+        self._values = [e["value"] for e in entries]
+        self._embeddings = embeddings
+
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        """一次批次計算所有文字的正規化 embedding"""
+        self._load_model()
+        embeddings = self._model.encode(
+            texts,
+            batch_size=32,
+            normalize_embeddings=True,
+            convert_to_numpy=True
+        )
+        return np.asarray(embeddings, dtype=np.float32)
+
+    @staticmethod
+    def _hash(text: str) -> str:
+        """精確比對用的內容雜湊"""
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get(self, text: str) -> Optional[list]:
+        """
+        查詢快取
+
+        Args:
+            text: 正規化後的逐字稿文字
+
+        Returns:
+            命中時回傳快取的值，否則 None
+        """
+        return self.get_many([text])[0]
+
+    def get_many(self, texts: List[str]) -> List[Optional[list]]:
+        """
+        批次查詢快取
+
+        Args:
+            texts: 正規化後的逐字稿文字列表
+
+        Returns:
+            與 texts 對應的快取值，未命中為 None
+        """
+        return [match[0] if match else None for match in self.match_many(texts)]
+
+    def match_many(self, texts: List[str]) -> List[Optional[Tuple[list, bool]]]:
+        """
+        批次查詢快取，並標示是否為精確命中
+
+        精確雜湊未命中的文字以單次 encode 呼叫計算 embedding，
+        再以一次矩陣乘法與所有快取向量比對。
+
+        Args:
+            texts: 正規化後的逐字稿文字列表
+
+        Returns:
+            與 texts 對應的 (快取值, 是否精確命中)，未命中為 None
+        """
+        keys = [self._hash(text) for text in texts]
+        results: List[Optional[Tuple[list, bool]]] = [None] * len(texts)
+
+        with self._lock:
+            misses = []
+            for i, key in enumerate(keys):
+                if key in self._index:
+                    results[i] = (self._values[self._index[key]], True)
+                else:
+                    misses.append(i)
+
+        if not misses:
+            return results
+
+        embeddings = self._embed([texts[i] for i in misses])
+
+        with self._lock:
+            # 保留 embedding，寫入快取時不必重新計算
+            for i, embedding in zip(misses, embeddings):
+                self._pending[keys[i]] = embedding
+
+            if self._embeddings is None or len(self._embeddings) == 0:
+                return results
+
+            # 向量皆已正規化，內積即為餘弦相似度
+            scores = self._embeddings @ embeddings.T
+            best = np.argmax(scores, axis=0)
+            for col, i in enumerate(misses):
+                if scores[best[col], col] >= self.threshold:
+                    results[i] = (self._values[best[col]], False)
+
+        return results
+
+    def put(self, text: str, value: list) -> None:
+        """
+        寫入快取
+
+        Args:
+            text: 正規化後的逐字稿文字
+            value: 可 JSON 序列化的值
+        """
+        key = self._hash(text)
+
+        with self._lock:
+            if key in self._index:
+                return
+            embedding = self._pending.pop(key, None)
+
+        if embedding is None:
+            embedding = self._embed([text])[0]
+
+        with self._lock:
+            if key in self._index:
+                return
+            self._index[key] = len(self._keys)
+            self._keys.append(key)
+            self._values.append(value)
+            if self._embeddings is None:
+                self._embeddings = embedding[None, :]
+            else:
+                self._embeddings = np.vstack([self._embeddings, embedding])
+            self._dirty = True
+
+    def save(self) -> None:
+        """將快取寫入磁碟"""
+        with self._lock:
+            if not self._dirty or self._embeddings is None:
+                return
+
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            entries = [
+                {"key": k, "value": v}
+                for k, v in zip(self._keys, self._values)
+            ]
+            (self.cache_dir / self.ENTRIES_FILE).write_text(
+                json.dumps(entries, ensure_ascii=False),
+                encoding="utf-8"
+            )
+            np.save(self.cache_dir / self.EMBEDDINGS_FILE, self._embeddings)
+            self._dirty = False
@@ -23,6 +23,19 @@ load_dotenv()
 
 console = Console()
 
+# 移除類型的顯示名稱
+_TYPE_NAMES = {
+    "filler": "語氣詞",
+    "repeat": "重複",
+    "restart": "重說",
+    "mouth_noise": "唇齒音",
+    "long_pause": "長停頓",
+}
+
+# 詳細編輯列表的顯示上限
+_DETAIL_ROW_LIMIT = 20
+_DETAIL_TEXT_WIDTH = 40
+
 
 def format_duration(seconds: float) -> str:
     """格式化時間長度"""
@@ -38,6 +51,13 @@ def format_percent(value: float) -> str:
     return f"{value:.1f}%"
 
 
+def _truncate(text: str, width: int) -> str:
+    """超過寬度時截斷並加上省略號（不做多餘的切片）"""
+    if len(text) <= width:
+        return text
+    return text[:width] + "..."
+
+
 @click.command()
 @click.argument('input_files', nargs=-1, type=click.Path(exists=True))
 @click.option('-o', '--output', type=click.Path(), help='輸出檔案路徑')
@@ -50,6 +70,11 @@ def format_percent(value: float) -> str:
 @click.option('--crossfade', default=30, type=int, help='Crossfade 毫秒數')
 @click.option('--min-confidence', default=0.7, type=float, help='最低信心閾值')
 @click.option('--analyze-only', is_flag=True, help='只分析不剪輯')
+@click.option(
+    '--include-words', is_flag=True,
+    help='在可疑段落附上單詞級時間戳（較精確但較耗 token）'
+)
+@click.option('--cache-dir', type=click.Path(), help='語意快取目錄（重複分析時重用結果）')
 @click.option('--export-report', type=click.Path(), help='匯出 JSON 報告')
 @click.option('--export-edl', type=click.Path(), help='匯出 EDL 檔案')
 @click.option('--export-markers', type=click.Path(), help='匯出標記檔案')
@@ -65,6 +90,8 @@ def main(
     crossfade: int,
     min_confidence: float,
     analyze_only: bool,
+    include_words: bool,
+    cache_dir: Optional[str],
     export_report: Optional[str],
     export_edl: Optional[str],
     export_markers: Optional[str],
@@ -106,13 +133,24 @@ def main(
             TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
             console=console
         ) as progress:
+            # 先建立轉錄器，讓模型在預處理期間於背景載入
+            transcriber = Transcriber(
+                model_size=whisper_model,
+                language=language,
+                hf_token=os.getenv("HF_TOKEN"),
+                prefetch_diarization=not no_diarization
+            )
+
             # Step 1: 預處理
             task1 = progress.add_task("預處理音訊...", total=100)
             preprocessor = AudioPreprocessor()
 
-            # 建立暫存檔案
+            # 建立暫存檔案，轉錄用的 PCM 與 WAV 由同一次解碼產生
             temp_path = Path("/tmp/reclip_temp.wav")
-            preprocessor.process(input_paths, temp_path, mode=mode)
+            whisper_pcm_path = Path("/tmp/reclip_temp.f32")
+            whisper_audio = preprocessor.process_for_whisper(
+                input_paths, temp_path, whisper_pcm_path, mode=mode
+            )
             progress.update(task1, completed=100)
 
             if verbose:
@@ -121,14 +159,8 @@ def main(
 
             # Step 2: 轉錄
             task2 = progress.add_task("轉錄中...", total=100)
-            transcriber = Transcriber(
-                model_size=whisper_model,
-                language=language,
-                hf_token=os.getenv("HF_TOKEN")
-            )
-
             transcript = transcriber.transcribe(
-                temp_path,
+                whisper_audio,
                 diarize=not no_diarization
             )
             progress.update(task2, completed=100)
@@ -140,7 +172,9 @@ def main(
             task3 = progress.add_task("分析中...", total=100)
             analyzer = Analyzer(
                 model=claude_model,
-                min_confidence=min_confidence
+                min_confidence=min_confidence,
+                include_words=include_words,
+                cache_dir=Path(cache_dir) if cache_dir else None
             )
 
             def update_analysis_progress(current, total):
@@ -201,8 +235,9 @@ def main(
             console.print(f"[green]分析報告已匯出: {export_report}[/green]")
 
         # 清理暫存
-        if temp_path.exists():
-            temp_path.unlink()
+        for path in (temp_path, whisper_pcm_path):
+            if path.exists():
+                path.unlink()
 
         console.print("\n[green]✓ 完成！[/green]")
 
@@ -249,18 +284,10 @@ def _display_results(
         stats_table.add_column("類型", style="cyan")
         stats_table.add_column("數量", justify="right")
 
-        type_names = {
-            "filler": "語氣詞",
-            "repeat": "重複",
-            "restart": "重說",
-            "mouth_noise": "唇齒音",
-            "long_pause": "長停頓",
-        }
-
+        type_name = _TYPE_NAMES.get
         for reason, count in analysis.statistics.items():
             if count > 0:
-                name = type_names.get(reason, reason)
-                stats_table.add_row(name, str(count))
+                stats_table.add_row(type_name(reason, reason), str(count))
 
         console.print(stats_table)
 
@@ -269,21 +296,26 @@ def _display_results(
         detail_table = Table(title="詳細編輯列表")
         detail_table.add_column("時間", style="dim")
         detail_table.add_column("類型")
-        detail_table.add_column("內容", max_width=40)
+        detail_table.add_column("內容", max_width=_DETAIL_TEXT_WIDTH)
         detail_table.add_column("信心", justify="right")
 
-        for removal in analysis.removals[:20]:  # 只顯示前 20 個
-            time_range = f"{removal.start:.2f}s - {removal.end:.2f}s"
-            text = removal.text[:40] + "..." if len(removal.text) > 40 else removal.text
-            detail_table.add_row(
-                time_range,
+        # 先建立所有列，再一次加入表格
+        rows = [
+            (
+                f"{removal.start:.2f}s - {removal.end:.2f}s",
                 removal.reason,
-                text,
-                f"{removal.confidence:.0%}"
+                _truncate(removal.text, _DETAIL_TEXT_WIDTH),
+                f"{removal.confidence:.0%}",
             )
+            for removal in analysis.removals[:_DETAIL_ROW_LIMIT]  # 只顯示前 20 個
+        ]
+
+        hidden = len(analysis.removals) - _DETAIL_ROW_LIMIT
+        if hidden > 0:
+            rows.append(("...", "...", f"(還有 {hidden} 項)", "..."))
 
-        if len(analysis.removals) > 20:
-            detail_table.add_row("...", "...", f"(還有 {len(analysis.removals) - 20} 項)", "...")
+        for row in rows:
+            detail_table.add_row(*row)
 
         console.print(detail_table)
 
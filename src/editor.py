@@ -2,12 +2,128 @@
 
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 
 import numpy as np
+import soundfile as sf
 from pydub import AudioSegment
 
-from .analyzer import AnalysisResult, Removal
+from .analyzer import AnalysisResult, Removal, removals_to_arrays
+
+try:
+    from numba import njit
+except ImportError:  # numba 為選用相依套件
+    njit = None
+
+# pydub sample_width（位元組）對應的 NumPy 型別
+_SAMPLE_DTYPES = {1: np.int8, 2: np.int16, 4: np.int32}
+
+# 可由 libsndfile 直接寫出的格式，其餘（mp3、m4a 等）交給 pydub/ffmpeg
+_SOUNDFILE_FORMATS = {".wav": "WAV", ".flac": "FLAC", ".aiff": "AIFF", ".aif": "AIFF"}
+_SOUNDFILE_SUBTYPES = {2: "PCM_16", 4: "PCM_32"}
+
+# 串流剪輯時每次讀取的 frame 數
+_STREAM_BLOCK_FRAMES = 65536
+
+
+def _nearest_zero_crossing(window: np.ndarray, offset: int) -> int:
+    """
+    由 offset 向兩側擴散，找出最近的零交叉點；找不到時回傳最接近零的點
+
+    結果與 NumPy 版本相同（距離相同時取較小的索引），但找到即停止，
+    不需掃描整個窗口。以 numba 編譯後作為 _zc_kernel 使用。
+    """
+    n = len(window)
+    for d in range(n):
+        lo = offset - d
+        if 0 <= lo < n - 1:
+            a = window[lo]
+            b = window[lo + 1]
+            if (a < 0) != (b < 0) or a == 0 or b == 0:
+                return lo
+        hi = offset + d
+        if d > 0 and 0 <= hi < n - 1:
+            a = window[hi]
+            b = window[hi + 1]
+            if (a < 0) != (b < 0) or a == 0 or b == 0:
+                return hi
+        if lo <= 0 and hi >= n - 2:
+            break
+
+    best = 0
+    best_abs = abs(window[0])
+    for i in range(1, n):
+        if abs(window[i]) < best_abs:
+            best_abs = abs(window[i])
+            best = i
+    return best
+
+
+_zc_kernel = (
+    njit(cache=True, boundscheck=False)(_nearest_zero_crossing) if njit else None
+)
+
+
+def _equal_power_fade(fade_len: int) -> Tuple[np.ndarray, np.ndarray]:
+    """產生等功率 crossfade 曲線 (fade_out, fade_in)，形狀為 (fade_len, 1)"""
+    ramp = np.linspace(0, 1, fade_len, dtype=np.float32)[:, None]
+    return np.sqrt(1 - ramp), np.sqrt(ramp)
+
+
+class _CrossfadeWriter:
+    """串流寫出保留區間
+
+    永遠保留最後 fade_len 個 frame 尚未寫出，讓下一個區間可以與其 crossfade。
+    """
+
+    def __init__(self, dst: sf.SoundFile, fade_len: int):
+        self._dst = dst
+        self._fade_len = fade_len
+        self._fade_out, self._fade_in = _equal_power_fade(fade_len)
+        self._tail: Optional[np.ndarray] = None
+        self.frames = 0
+
+    def can_crossfade(self, region_len: int) -> bool:
+        """與 AudioSegment.append(crossfade=) 相同：任一側太短時直接連接"""
+        return (
+            self._fade_len > 0
+            and self.frames >= self._fade_len
+            and region_len >= self._fade_len
+        )
+
+    def crossfade(self, head: np.ndarray) -> None:
+        """將新區間的開頭與目前尾端重疊混合"""
+        limits = np.iinfo(head.dtype)
+        mixed = (
+            self._tail.astype(np.float32) * self._fade_out
+            + head.astype(np.float32) * self._fade_in
+        )
+        self._tail = np.clip(mixed, limits.min, limits.max).astype(head.dtype)
+
+    def write(self, block: np.ndarray) -> None:
+        """接續寫入目前區間的資料"""
+        if len(block) == 0:
+            return
+
+        self.frames += len(block)
+        if len(block) >= self._fade_len:
+            if self._tail is not None:
+                self._dst.write(self._tail)
+            cut = len(block) - self._fade_len
+            self._dst.write(block[:cut])
+            self._tail = block[cut:]
+        else:
+            combined = block if self._tail is None else np.concatenate([self._tail, block])
+            cut = max(0, len(combined) - self._fade_len)
+            if cut:
+                self._dst.write(combined[:cut])
+            self._tail = combined[cut:]
+
+    def close(self) -> None:
+        """寫出剩餘的尾端"""
+        if self._tail is not None and len(self._tail) > 0:
+            self._dst.write(self._tail)
+        self._tail = None
 
 
 @dataclass
@@ -92,27 +208,24 @@ class Editor:
         Returns:
             EditReport
         """
+        sorted_removals = self._prepare_removals(analysis)
+
+        # libsndfile 可讀寫時以串流方式剪輯，不將整個檔案載入記憶體
+        if output_path.suffix.lower() in _SOUNDFILE_FORMATS:
+            src = self._open_soundfile(audio_path)
+            if src is not None:
+                with src:
+                    return self._edit_streamed(
+                        src, sorted_removals, audio_path, output_path
+                    )
+
         # 載入音訊
         audio = AudioSegment.from_file(str(audio_path))
         original_duration = len(audio) / 1000.0  # 毫秒轉秒
         sample_rate = audio.frame_rate
 
-        # 過濾太短的移除區間
-        valid_removals = [
-            r for r in analysis.removals
-            if (r.end - r.start) * 1000 >= self.min_removal_ms
-        ]
-
-        # 合併相鄰的移除區間
-        merged_removals = self._merge_removals(valid_removals)
-
-        # 排序移除區間
-        sorted_removals = sorted(merged_removals, key=lambda r: r.start)
-
         # 轉換音訊為 numpy 陣列以進行零交叉點搜尋
-        samples = np.array(audio.get_array_of_samples())
-        if audio.channels == 2:
-            samples = samples.reshape((-1, 2)).mean(axis=1)
+        samples = self._to_mono(audio)
 
         # 調整切點到零交叉點
         adjusted_removals = self._adjust_to_zero_crossings(
@@ -120,7 +233,7 @@ class Editor:
         )
 
         # 執行剪輯
-        result_audio, applied_edits = self._apply_removals(
+        result, applied_edits = self._apply_removals(
             audio, adjusted_removals
         )
 
@@ -128,9 +241,9 @@ class Editor:
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
         # 匯出
-        result_audio.export(str(output_path), format=output_path.suffix[1:])
+        self._export(result, audio, output_path)
 
-        edited_duration = len(result_audio) / 1000.0
+        edited_duration = len(result) / sample_rate
 
         return EditReport(
             input_path=audio_path,
@@ -140,36 +253,189 @@ class Editor:
             edits=applied_edits
         )
 
-    def _merge_removals(self, removals: List[Removal]) -> List[Removal]:
-        """合併相鄰的移除區間"""
+    def _prepare_removals(self, analysis: AnalysisResult) -> List[Removal]:
+        """過濾太短的移除區間並合併相鄰區間（依開始時間排序）"""
+        arrays = analysis.as_arrays()
+        durations_ms = (arrays["end"] - arrays["start"]) * 1000
+        valid = np.flatnonzero(durations_ms >= self.min_removal_ms)
+
+        return self._merge_removals(
+            [analysis.removals[i] for i in valid],
+            {key: values[valid] for key, values in arrays.items()}
+        )
+
+    @staticmethod
+    def _open_soundfile(path: Path) -> Optional[sf.SoundFile]:
+        """以 libsndfile 開啟音訊，格式不支援時回傳 None"""
+        try:
+            return sf.SoundFile(str(path))
+        except RuntimeError:
+            return None
+
+    def _edit_streamed(
+        self,
+        src: sf.SoundFile,
+        removals: List[Removal],
+        audio_path: Path,
+        output_path: Path
+    ) -> EditReport:
+        """
+        以串流方式執行剪輯
+
+        只讀取切點附近的小窗口搜尋零交叉點，保留區間則分塊讀出並直接寫入輸出檔，
+        記憶體用量與檔案長度無關。
+
+        Args:
+            src: 已開啟的原始音訊
+            removals: 排序後的移除區間
+            audio_path: 原始音訊路徑
+            output_path: 輸出路徑
+
+        Returns:
+            EditReport
+        """
+        sample_rate = src.samplerate
+
+        adjusted_removals = self._adjust_to_zero_crossings_in_file(removals, src)
+        regions, applied_edits = self._keep_regions(
+            adjusted_removals, sample_rate, src.frames
+        )
+
+        # 確保輸出目錄存在
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+
+        out_format = _SOUNDFILE_FORMATS[output_path.suffix.lower()]
+        subtype = src.subtype if sf.check_format(out_format, src.subtype) else None
+
+        fade_len = int(self.crossfade_ms * sample_rate / 1000)
+        with sf.SoundFile(
+            str(output_path), "w",
+            samplerate=sample_rate,
+            channels=src.channels,
+            format=out_format,
+            subtype=subtype
+        ) as dst:
+            writer = _CrossfadeWriter(dst, fade_len)
+            for start, end in regions:
+                src.seek(start)
+                remaining = end - start
+
+                if writer.can_crossfade(remaining):
+                    writer.crossfade(src.read(fade_len, dtype="int32", always_2d=True))
+                    remaining -= fade_len
+
+                while remaining > 0:
+                    block = src.read(
+                        min(_STREAM_BLOCK_FRAMES, remaining),
+                        dtype="int32",
+                        always_2d=True
+                    )
+                    if len(block) == 0:
+                        break
+                    writer.write(block)
+                    remaining -= len(block)
+            writer.close()
+
+        return EditReport(
+            input_path=audio_path,
+            output_path=output_path,
+            original_duration=src.frames / sample_rate,
+            edited_duration=writer.frames / sample_rate,
+            edits=applied_edits
+        )
+
+    @staticmethod
+    def _export(
+        frames: np.ndarray,
+        audio: AudioSegment,
+        output_path: Path
+    ) -> None:
+        """
+        匯出剪輯結果
+
+        WAV/FLAC/AIFF 直接以 libsndfile 寫出，避免 ffmpeg 子行程與管線複製；
+        其他格式仍透過 pydub 交給 ffmpeg 編碼。
+
+        Args:
+            frames: (frames, channels) 樣本陣列
+            audio: 原始音訊（提供取樣率、樣本寬度等格式資訊）
+            output_path: 輸出路徑
+        """
+        suffix = output_path.suffix.lower()
+        subtype = _SOUNDFILE_SUBTYPES.get(audio.sample_width)
+
+        if suffix in _SOUNDFILE_FORMATS and subtype:
+            sf.write(
+                str(output_path), frames, audio.frame_rate,
+                subtype=subtype, format=_SOUNDFILE_FORMATS[suffix]
+            )
+            return
+
+        AudioSegment(
+            data=frames.tobytes(),
+            sample_width=audio.sample_width,
+            frame_rate=audio.frame_rate,
+            channels=audio.channels
+        ).export(str(output_path), format=suffix[1:])
+
+    def _merge_removals(
+        self,
+        removals: List[Removal],
+        arrays: Optional[Dict[str, np.ndarray]] = None
+    ) -> List[Removal]:
+        """
+        合併相鄰的移除區間
+
+        分組完全以陣列運算完成，只為實際合併的群組建立新的 Removal。
+
+        Args:
+            removals: 移除區間列表
+            arrays: 對應的欄位陣列（未提供時由 removals 建立）
+
+        Returns:
+            依開始時間排序的合併結果
+        """
         if not removals:
             return []
 
-        sorted_removals = sorted(removals, key=lambda r: r.start)
-        merged = [sorted_removals[0]]
-
-        for removal in sorted_removals[1:]:
-            last = merged[-1]
-            gap_ms = (removal.start - last.end) * 1000
-
-            if gap_ms <= self.merge_gap_ms:
-                # 合併區間
-                merged_removal = Removal(
-                    start=last.start,
-                    end=removal.end,
-                    reason=last.reason,  # 使用第一個的原因
-                    text=f"{last.text} ... {removal.text}",
-                    confidence=min(last.confidence, removal.confidence)
-                )
-                merged[-1] = merged_removal
-            else:
-                merged.append(removal)
+        if arrays is None:
+            arrays = removals_to_arrays(removals)
+
+        order = np.argsort(arrays["start"], kind="stable")
+        starts = arrays["start"][order]
+        ends = arrays["end"][order]
+        confidences = arrays["confidence"][order]
+
+        # 與先前所有區間的最遠結束點距離超過閾值時，開始新的群組
+        reach = np.maximum.accumulate(ends)
+        breaks = np.flatnonzero(starts[1:] - reach[:-1] > self.merge_gap_ms / 1000) + 1
+        group_starts = np.concatenate(([0], breaks))
+        group_ends = np.maximum.reduceat(ends, group_starts)
+        group_confidences = np.minimum.reduceat(confidences, group_starts)
+        bounds = np.append(group_starts, len(order))
+
+        merged = []
+        for g in range(len(group_starts)):
+            lo, hi = bounds[g], bounds[g + 1]
+            first = removals[order[lo]]
+            if hi - lo == 1:
+                merged.append(first)
+                continue
+
+            merged.append(Removal(
+                start=first.start,
+                end=float(group_ends[g]),
+                reason=first.reason,  # 使用第一個的原因
+                text=" ... ".join(removals[i].text for i in order[lo:hi]),
+                confidence=float(group_confidences[g])
+            ))
 
         return merged
 
     def _find_zero_crossing(
         self,
         samples: np.ndarray,
+        zero_crossings: np.ndarray,
         target_ms: float,
         sample_rate: int,
         search_direction: str = "both"
@@ -179,6 +445,7 @@ class Editor:
 
         Args:
             samples: 音訊樣本陣列
+            zero_crossings: 預先計算的零交叉點索引（已排序）
             target_ms: 目標時間點（毫秒）
             sample_rate: 取樣率
             search_direction: 搜尋方向 ("forward", "backward", "both")
@@ -196,28 +463,81 @@ class Editor:
         start = max(0, target_sample - search_samples)
         end = min(len(samples) - 1, target_sample + search_samples)
 
-        # 尋找零交叉點
-        best_idx = target_sample
-        min_abs_value = abs(samples[target_sample])
-
-        for i in range(start, end):
-            if i < len(samples) - 1:
-                # 檢查是否為零交叉點（符號改變）
-                if samples[i] * samples[i + 1] <= 0:
-                    # 選擇更接近目標的零交叉點
-                    if abs(i - target_sample) < abs(best_idx - target_sample):
-                        best_idx = i
-                        min_abs_value = 0
-                        break
+        # 二分搜尋最接近目標的零交叉點
+        idx = int(np.searchsorted(zero_crossings, target_sample))
+        candidates = zero_crossings[max(0, idx - 1):idx + 1]
+        if len(candidates) > 0:
+            nearest = int(candidates[np.argmin(np.abs(candidates - target_sample))])
+            if start <= nearest < end:
+                return nearest
 
         # 如果找不到零交叉點，選擇最接近零的點
-        if min_abs_value > 0:
-            for i in range(start, end):
-                if abs(samples[i]) < min_abs_value:
-                    min_abs_value = abs(samples[i])
-                    best_idx = i
+        window = samples[start:end + 1].astype(np.int64)
+        if len(window) == 0:
+            return target_sample
+        return start + int(np.argmin(np.abs(window)))
+
+    @staticmethod
+    def _compute_zero_crossings(samples: np.ndarray) -> np.ndarray:
+        """
+        一次計算整段音訊的零交叉點
+
+        Returns:
+            所有 i 使 samples[i] 與 samples[i + 1] 異號（或其一為零）的索引
+        """
+        if len(samples) < 2:
+            return np.empty(0, dtype=np.intp)
+
+        negative = np.signbit(samples)
+        crossing = negative[:-1] != negative[1:]
+        crossing |= samples[:-1] == 0
+        crossing |= samples[1:] == 0
+        return np.flatnonzero(crossing)
+
+    def _read_zero_crossing(
+        self,
+        src: sf.SoundFile,
+        target_ms: float,
+        search_direction: str = "both"
+    ) -> int:
+        """
+        只讀取目標點附近的窗口，在其中尋找零交叉點
+
+        Args:
+            src: 已開啟的音訊檔案
+            target_ms: 目標時間點（毫秒）
+            search_direction: 搜尋方向 ("forward", "backward", "both")
+
+        Returns:
+            零交叉點的樣本索引
+        """
+        sample_rate = src.samplerate
+        target_sample = int(target_ms * sample_rate / 1000)
+        search_samples = int(self.zero_crossing_search_ms * sample_rate / 1000)
+
+        # 確保在有效範圍內
+        target_sample = max(0, min(target_sample, src.frames - 1))
+
+        # 定義搜尋範圍
+        start = max(0, target_sample - search_samples)
+        end = min(src.frames - 1, target_sample + search_samples)
+
+        src.seek(start)
+        frames = src.read(end - start + 1, dtype="int32", always_2d=True)
+        window = frames.sum(axis=1, dtype=np.int64) // src.channels
+        if len(window) == 0:
+            return target_sample
 
-        return best_idx
+        if _zc_kernel is not None:
+            return start + int(_zc_kernel(window, target_sample - start))
+
+        crossings = self._compute_zero_crossings(window)
+        if len(crossings) > 0:
+            offset = target_sample - start
+            return start + int(crossings[np.argmin(np.abs(crossings - offset))])
+
+        # 如果找不到零交叉點，選擇最接近零的點
+        return start + int(np.argmin(np.abs(window)))
 
     def _adjust_to_zero_crossings(
         self,
@@ -228,25 +548,62 @@ class Editor:
         """
         將所有移除區間的切點調整到零交叉點
 
+        Returns:
+            調整後的 (start_ms, end_ms, removal) 列表
+        """
+        zero_crossings = self._compute_zero_crossings(samples)
+
+        return self._snap_removals(
+            removals,
+            sample_rate,
+            lambda ms, direction: self._find_zero_crossing(
+                samples, zero_crossings, ms, sample_rate, direction
+            )
+        )
+
+    def _adjust_to_zero_crossings_in_file(
+        self,
+        removals: List[Removal],
+        src: sf.SoundFile
+    ) -> List[Tuple[float, float, Removal]]:
+        """
+        將所有移除區間的切點調整到零交叉點（直接從檔案讀取切點附近的樣本）
+
+        Returns:
+            調整後的 (start_ms, end_ms, removal) 列表
+        """
+        return self._snap_removals(
+            removals,
+            src.samplerate,
+            lambda ms, direction: self._read_zero_crossing(src, ms, direction)
+        )
+
+    @staticmethod
+    def _snap_removals(
+        removals: List[Removal],
+        sample_rate: int,
+        find_zero_crossing: Callable[[float, str], int]
+    ) -> List[Tuple[float, float, Removal]]:
+        """
+        以指定的搜尋函式調整每個移除區間的切點
+
+        Args:
+            removals: 排序後的移除區間
+            sample_rate: 取樣率
+            find_zero_crossing: (target_ms, direction) -> 樣本索引
+
         Returns:
             調整後的 (start_ms, end_ms, removal) 列表
         """
         adjusted = []
 
         for removal in removals:
-            start_ms = removal.start * 1000
-            end_ms = removal.end * 1000
-
             # 調整開始點
-            start_sample = self._find_zero_crossing(
-                samples, start_ms, sample_rate, "backward"
-            )
+            start_sample = find_zero_crossing(removal.start * 1000, "backward")
             adjusted_start_ms = start_sample * 1000 / sample_rate
 
             # 調整結束點
-            end_sample = self._find_zero_crossing(
-                samples, end_ms, sample_rate, "forward"
-            )
+            end_sample = find_zero_crossing(removal.end * 1000, "forward")
             adjusted_end_ms = end_sample * 1000 / sample_rate
 
             # 確保調整後區間仍然有效
@@ -255,33 +612,33 @@ class Editor:
 
         return adjusted
 
-    def _apply_removals(
-        self,
-        audio: AudioSegment,
-        removals: List[Tuple[float, float, Removal]]
-    ) -> Tuple[AudioSegment, List[AppliedEdit]]:
+    @staticmethod
+    def _keep_regions(
+        removals: List[Tuple[float, float, Removal]],
+        sample_rate: int,
+        total_frames: int
+    ) -> Tuple[List[Tuple[int, int]], List[AppliedEdit]]:
         """
-        套用移除區間
+        由調整後的移除區間計算保留區間
 
         Args:
-            audio: 原始音訊
             removals: 調整後的移除區間列表
+            sample_rate: 取樣率
+            total_frames: 音訊總 frame 數
 
         Returns:
-            (剪輯後音訊, 套用的編輯列表)
+            ((start_frame, end_frame) 保留區間列表, 套用的編輯列表)
         """
-        if not removals:
-            return audio, []
-
         applied_edits = []
-        segments = []
-        last_end = 0.0
+        regions = []
+        last_end = 0
 
         for start_ms, end_ms, removal in removals:
+            start = int(start_ms * sample_rate / 1000)
+
             # 加入保留的區間
-            if start_ms > last_end:
-                segment = audio[last_end:start_ms]
-                segments.append(segment)
+            if start > last_end:
+                regions.append((last_end, start))
 
             # 記錄編輯
             applied_edits.append(AppliedEdit(
@@ -291,34 +648,110 @@ class Editor:
                 text=removal.text
             ))
 
-            last_end = end_ms
+            last_end = int(end_ms * sample_rate / 1000)
 
         # 加入最後一段
-        if last_end < len(audio):
-            segments.append(audio[last_end:])
+        if last_end < total_frames:
+            regions.append((last_end, total_frames))
+
+        return regions, applied_edits
+
+    def _apply_removals(
+        self,
+        audio: AudioSegment,
+        removals: List[Tuple[float, float, Removal]]
+    ) -> Tuple[np.ndarray, List[AppliedEdit]]:
+        """
+        套用移除區間
+
+        Args:
+            audio: 原始音訊
+            removals: 調整後的移除區間列表
+
+        Returns:
+            (剪輯後的 (frames, channels) 樣本陣列, 套用的編輯列表)
+        """
+        samples = self._to_frames(audio)
+        if not removals:
+            return samples, []
+
+        sample_rate = audio.frame_rate
+        regions, applied_edits = self._keep_regions(
+            removals, sample_rate, len(samples)
+        )
+
+        # 保留的區間（NumPy view，不複製資料）
+        segments = [samples[start:end] for start, end in regions]
 
         # 合併所有區間，套用 crossfade
         if not segments:
-            return AudioSegment.silent(duration=0), applied_edits
+            return samples[:0], applied_edits
 
-        result = segments[0]
-        for segment in segments[1:]:
-            result = self._apply_crossfade(result, segment)
+        return self._concat_with_crossfade(segments, sample_rate), applied_edits
+
+    @staticmethod
+    def _to_frames(audio: AudioSegment) -> np.ndarray:
+        """將 AudioSegment 轉為 (frames, channels) 的 NumPy view"""
+        dtype = _SAMPLE_DTYPES[audio.sample_width]
+        return np.frombuffer(audio.raw_data, dtype=dtype).reshape(-1, audio.channels)
+
+    @classmethod
+    def _to_mono(cls, audio: AudioSegment) -> np.ndarray:
+        """以整數運算將多聲道混成單聲道，避免 float64 暫存陣列"""
+        frames = cls._to_frames(audio)
+        if audio.channels == 1:
+            return frames[:, 0]
 
-        return result, applied_edits
+        acc_dtype = np.int64 if frames.dtype == np.int32 else np.int32
+        mixed = frames.sum(axis=1, dtype=acc_dtype) // audio.channels
+        return mixed.astype(frames.dtype)
 
-    def _apply_crossfade(
+    def _concat_with_crossfade(
         self,
-        segment1: AudioSegment,
-        segment2: AudioSegment
-    ) -> AudioSegment:
-        """套用 crossfade"""
-        # 確保兩個片段都夠長
-        if len(segment1) < self.crossfade_ms or len(segment2) < self.crossfade_ms:
-            # 片段太短，直接連接
-            return segment1 + segment2
+        segments: List[np.ndarray],
+        sample_rate: int
+    ) -> np.ndarray:
+        """
+        一次性串接所有保留區間，在接點套用等功率 crossfade
+
+        與 AudioSegment.append(crossfade=) 相同，接點兩側重疊
+        crossfade 長度；任一側太短時直接連接。
 
-        return segment1.append(segment2, crossfade=self.crossfade_ms)
+        Args:
+            segments: (frames, channels) 保留區間列表
+            sample_rate: 取樣率
+
+        Returns:
+            剪輯後的 (frames, channels) 陣列
+        """
+        fade_len = int(self.crossfade_ms * sample_rate / 1000)
+
+        # 先決定每個接點是否 crossfade，以便預先配置輸出陣列
+        overlaps = [False]
+        total = len(segments[0])
+        for segment in segments[1:]:
+            overlap = fade_len > 0 and total >= fade_len and len(segment) >= fade_len
+            overlaps.append(overlap)
+            total += len(segment) - (fade_len if overlap else 0)
+
+        dtype = segments[0].dtype
+        limits = np.iinfo(dtype)
+        out = np.empty((total, segments[0].shape[1]), dtype=dtype)
+
+        fade_out, fade_in = _equal_power_fade(fade_len)
+
+        pos = 0
+        for segment, overlap in zip(segments, overlaps):
+            if overlap:
+                tail = out[pos - fade_len:pos].astype(np.float32)
+                head = segment[:fade_len].astype(np.float32)
+                mixed = tail * fade_out + head * fade_in
+                out[pos - fade_len:pos] = np.clip(mixed, limits.min, limits.max)
+                segment = segment[fade_len:]
+            out[pos:pos + len(segment)] = segment
+            pos += len(segment)
+
+        return out
 
     def preview_removals(
         self,
@@ -335,22 +768,18 @@ class Editor:
         Returns:
             移除區間的詳細資訊列表
         """
-        audio = AudioSegment.from_file(str(audio_path))
-        sample_rate = audio.frame_rate
-
-        samples = np.array(audio.get_array_of_samples())
-        if audio.channels == 2:
-            samples = samples.reshape((-1, 2)).mean(axis=1)
-
-        valid_removals = [
-            r for r in analysis.removals
-            if (r.end - r.start) * 1000 >= self.min_removal_ms
-        ]
-        merged = self._merge_removals(valid_removals)
-        sorted_removals = sorted(merged, key=lambda r: r.start)
-        adjusted = self._adjust_to_zero_crossings(
-            sorted_removals, samples, sample_rate
-        )
+        sorted_removals = self._prepare_removals(analysis)
+
+        src = self._open_soundfile(audio_path)
+        if src is not None:
+            with src:
+                adjusted = self._adjust_to_zero_crossings_in_file(sorted_removals, src)
+        else:
+            audio = AudioSegment.from_file(str(audio_path))
+            samples = self._to_mono(audio)
+            adjusted = self._adjust_to_zero_crossings(
+                sorted_removals, samples, audio.frame_rate
+            )
 
         preview = []
         for start_ms, end_ms, removal in adjusted:
@@ -1,11 +1,41 @@
 """報告匯出器 - 匯出 JSON 報告與 EDL 檔案"""
 
+import csv
+import io
 import json
+from collections import defaultdict
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import List, Literal, Optional, Tuple
 
-from .editor import EditReport
+import numpy as np
+
+from .editor import AppliedEdit, EditReport
+
+try:
+    import orjson
+except ImportError:  # orjson 為選用相依套件
+    orjson = None
+
+# 匯出檔案的寫入緩衝大小
+_WRITE_BUFFER_SIZE = 1 << 20
+
+
+class _ReportEncoder(json.JSONEncoder):
+    """序列化時才逐一轉換 AppliedEdit，不預先建立整個 dict 列表"""
+
+    def default(self, o):
+        """將 AppliedEdit 轉為字典"""
+        if isinstance(o, AppliedEdit):
+            return o.to_dict()
+        return super().default(o)
+
+
+def _msgpack_default(o):
+    """msgpack 序列化時將 AppliedEdit 轉為字典"""
+    if isinstance(o, AppliedEdit):
+        return o.to_dict()
+    raise TypeError(f"無法序列化的型別: {type(o).__name__}")
 
 
 class ReportExporter:
@@ -18,7 +48,8 @@ class ReportExporter:
     def to_json(
         report: EditReport,
         output_path: Path,
-        pretty: bool = True
+        pretty: bool = True,
+        format: Literal["json", "msgpack"] = "json"
     ) -> None:
         """
         匯出 JSON 報告
@@ -26,7 +57,9 @@ class ReportExporter:
         Args:
             report: 編輯報告
             output_path: 輸出路徑
-            pretty: 是否美化輸出
+            pretty: 是否美化輸出（僅 JSON）
+            format: 輸出格式，"msgpack" 輸出體積更小、解析更快的二進位格式，
+                供程式讀取（需安裝 msgpack）
         """
         data = {
             "version": "1.0",
@@ -42,41 +75,60 @@ class ReportExporter:
                 if report.original_duration > 0 else 0
             ),
             "edit_count": len(report.edits),
-            "edits": [e.to_dict() for e in report.edits],
+            # 直接交給序列化器：orjson 原生支援 dataclass，
+            # 標準 json 則由 _ReportEncoder 逐一轉換
+            "edits": report.edits,
             "statistics": ReportExporter._compute_statistics(report)
         }
 
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
-        indent = 2 if pretty else None
-        output_path.write_text(
-            json.dumps(data, ensure_ascii=False, indent=indent),
-            encoding="utf-8"
-        )
+        if format == "msgpack":
+            import msgpack
+
+            output_path.write_bytes(msgpack.packb(
+                data, default=_msgpack_default, use_bin_type=True
+            ))
+            return
+
+        with open(output_path, "wb", buffering=_WRITE_BUFFER_SIZE) as f:
+            if orjson is not None:
+                # orjson 直接輸出 UTF-8 bytes，不需再經過 str.encode
+                option = orjson.OPT_NON_STR_KEYS
+                if pretty:
+                    option |= orjson.OPT_INDENT_2
+                f.write(orjson.dumps(data, option=option))
+                return
+
+            # 標準 json 直接序列化到緩衝寫入器，不建立完整字串
+            indent = 2 if pretty else None
+            with io.TextIOWrapper(f, encoding="utf-8") as text:
+                json.dump(
+                    data, text,
+                    cls=_ReportEncoder, ensure_ascii=False, indent=indent
+                )
 
     @staticmethod
     def _compute_statistics(report: EditReport) -> dict:
         """計算統計資訊"""
-        stats = {
-            "by_reason": {},
-            "total_removed_duration": 0.0,
-        }
+        # 每個原因累計 [次數, 時長]，每個編輯只做一次字典查詢
+        by_reason = defaultdict(lambda: [0, 0.0])
+        total = 0.0
 
         for edit in report.edits:
-            reason = edit.reason
             duration = edit.original_end - edit.original_start
-
-            if reason not in stats["by_reason"]:
-                stats["by_reason"][reason] = {
-                    "count": 0,
-                    "duration": 0.0
-                }
-
-            stats["by_reason"][reason]["count"] += 1
-            stats["by_reason"][reason]["duration"] += duration
-            stats["total_removed_duration"] += duration
-
-        return stats
+            acc = by_reason[edit.reason]
+            acc[0] += 1
+            acc[1] += duration
+            total += duration
+
+        return {
+            "by_reason": {
+                reason: {"count": count, "duration": duration}
+                for reason, (count, duration) in by_reason.items()
+            },
+            "total_removed_duration": total,
+        }
 
     @staticmethod
     def to_edl(
@@ -97,46 +149,48 @@ class ReportExporter:
             fps: 影格率（用於時間碼轉換）
             title: EDL 標題
         """
-        lines = []
-
-        # EDL 標頭
-        edl_title = title or report.input_path.stem
-        lines.append(f"TITLE: {edl_title}")
-        lines.append(f"FCM: NON-DROP FRAME")
-        lines.append("")
-
         # 計算保留的區間
         keep_regions = ReportExporter._compute_keep_regions(report)
+        clip_comment = f"* FROM CLIP NAME: {report.input_path.name}\n"
 
-        # 生成 EDL 事件
-        for i, (start, end) in enumerate(keep_regions, 1):
-            event_num = f"{i:03d}"
-            reel = "AX"  # Audio eXternal
-
-            # 轉換時間碼
-            src_in = ReportExporter._seconds_to_timecode(start, fps)
-            src_out = ReportExporter._seconds_to_timecode(end, fps)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
 
-            # 計算記錄時間碼（累計時間）
-            rec_start = sum(
-                keep_regions[j][1] - keep_regions[j][0]
-                for j in range(i - 1)
+        with output_path.open(
+            "w", encoding="utf-8", buffering=_WRITE_BUFFER_SIZE
+        ) as f:
+            # EDL 標頭
+            edl_title = title or report.input_path.stem
+            f.write(f"TITLE: {edl_title}\n")
+            drop_frame = ReportExporter._timecode_base(fps)[1] > 0
+            f.write(f"FCM: {'DROP FRAME' if drop_frame else 'NON-DROP FRAME'}\n")
+
+            # 一次換算所有來源與記錄時間碼（記錄時間碼為保留區間長度的累計）
+            regions = np.array(keep_regions, dtype=np.float64).reshape(-1, 2)
+            rec_ends = np.cumsum(regions[:, 1] - regions[:, 0])
+            rec_starts = np.concatenate(([0.0], rec_ends))[:-1]
+            timecodes = ReportExporter._seconds_to_timecodes(
+                np.concatenate((regions[:, 0], regions[:, 1], rec_starts, rec_ends)),
+                fps
             )
-            rec_end = rec_start + (end - start)
+            count = len(regions)
+            src_ins = timecodes[:count]
+            src_outs = timecodes[count:2 * count]
+            rec_ins = timecodes[2 * count:3 * count]
+            rec_outs = timecodes[3 * count:]
 
-            rec_in = ReportExporter._seconds_to_timecode(rec_start, fps)
-            rec_out = ReportExporter._seconds_to_timecode(rec_end, fps)
-
-            # EDL 行格式
-            line = f"{event_num}  {reel}       AA/V  C        {src_in} {src_out} {rec_in} {rec_out}"
-            lines.append(line)
-
-            # 檔案名稱註解
-            lines.append(f"* FROM CLIP NAME: {report.input_path.name}")
-            lines.append("")
-
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        output_path.write_text("\n".join(lines), encoding="utf-8")
+            # 生成 EDL 事件（逐行寫入緩衝，不累積整份內容）
+            reel = "AX"  # Audio eXternal
+            for i, (src_in, src_out, rec_in, rec_out) in enumerate(
+                zip(src_ins, src_outs, rec_ins, rec_outs), 1
+            ):
+                event_num = f"{i:03d}"
+
+                # 事件之間以空行分隔，EDL 行格式後接檔案名稱註解
+                f.write(
+                    f"\n{event_num}  {reel}       AA/V  C        "
+                    f"{src_in} {src_out} {rec_in} {rec_out}\n"
+                )
+                f.write(clip_comment)
 
     @staticmethod
     def _compute_keep_regions(report: EditReport) -> list:
@@ -144,27 +198,57 @@ class ReportExporter:
         if not report.edits:
             return [(0.0, report.original_duration)]
 
+        count = len(report.edits)
+        starts = np.fromiter(
+            (e.original_start for e in report.edits), dtype=np.float64, count=count
+        )
+        ends = np.fromiter(
+            (e.original_end for e in report.edits), dtype=np.float64, count=count
+        )
+
         # 排序編輯
-        sorted_edits = sorted(report.edits, key=lambda e: e.original_start)
+        order = np.argsort(starts, kind="stable")
+        starts = starts[order]
+        ends = ends[order]
 
-        regions = []
-        last_end = 0.0
+        # 每個編輯之前已涵蓋到的最遠位置（累計最大結束時間）
+        cum_end = np.maximum.accumulate(ends)
+        prev_end = np.concatenate(([0.0], cum_end[:-1]))
 
-        for edit in sorted_edits:
-            if edit.original_start > last_end:
-                regions.append((last_end, edit.original_start))
-            last_end = edit.original_end
+        # 與前一段移除之間有空隙者即為保留區間
+        gap = starts > prev_end
+        regions = list(zip(prev_end[gap].tolist(), starts[gap].tolist()))
 
         # 最後一段
+        last_end = float(cum_end[-1])
         if last_end < report.original_duration:
             regions.append((last_end, report.original_duration))
 
         return regions
 
+    @staticmethod
+    def _timecode_base(fps: float) -> Tuple[int, int]:
+        """
+        取得時間碼的名義影格率與每分鐘丟棄的影格數
+
+        29.97 / 59.94 使用 SMPTE drop-frame；其餘 NTSC 影格率
+        （如 23.976）沒有 drop-frame 標準，以名義影格率計數。
+
+        Args:
+            fps: 影格率
+
+        Returns:
+            (名義影格率, 每分鐘丟棄影格數)
+        """
+        nominal = int(round(fps))
+        if nominal in (30, 60) and abs(fps - nominal) > 1e-6:
+            return nominal, nominal // 15
+        return nominal, 0
+
     @staticmethod
     def _seconds_to_timecode(seconds: float, fps: float = 30.0) -> str:
         """
-        將秒數轉換為時間碼格式 (HH:MM:SS:FF)
+        將秒數轉換為時間碼格式 (HH:MM:SS:FF，drop-frame 為 HH:MM:SS;FF)
 
         Args:
             seconds: 秒數
@@ -173,18 +257,47 @@ class ReportExporter:
         Returns:
             時間碼字串
         """
-        total_frames = int(seconds * fps)
+        return ReportExporter._seconds_to_timecodes(
+            np.array([seconds], dtype=np.float64), fps
+        )[0]
 
-        frames = total_frames % int(fps)
-        total_seconds = total_frames // int(fps)
+    @staticmethod
+    def _seconds_to_timecodes(seconds: np.ndarray, fps: float = 30.0) -> List[str]:
+        """
+        批次將秒數轉換為時間碼
+
+        影格換算全部以 NumPy 陣列運算完成，只有最後的字串格式化在 Python 中進行。
+
+        Args:
+            seconds: 秒數陣列
+            fps: 影格率
 
-        secs = total_seconds % 60
-        total_minutes = total_seconds // 60
+        Returns:
+            與 seconds 對應的時間碼字串列表
+        """
+        nominal, drop = ReportExporter._timecode_base(fps)
+        total_frames = np.rint(seconds * fps).astype(np.int64)
+
+        if drop:
+            # SMPTE drop-frame：除每第十分鐘外，每分鐘開頭跳過 drop 個影格編號
+            frames_per_10min = int(round(fps * 600))
+            frames_per_min = nominal * 60 - drop
+            tens, rem = np.divmod(total_frames, frames_per_10min)
+            total_frames = total_frames + 9 * drop * tens + np.where(
+                rem > drop, drop * ((rem - drop) // frames_per_min), 0
+            )
 
-        mins = total_minutes % 60
-        hours = total_minutes // 60
+        total_seconds, frames = np.divmod(total_frames, nominal)
+        total_minutes, secs = np.divmod(total_seconds, 60)
+        hours, mins = np.divmod(total_minutes, 60)
 
-        return f"{hours:02d}:{mins:02d}:{secs:02d}:{frames:02d}"
+        sep = ";" if drop else ":"
+        return [
+            f"{h:02d}:{m:02d}:{s:02d}{sep}{f:02d}"
+            for h, m, s, f in zip(
+                hours.tolist(), mins.tolist(), secs.tolist(), frames.tolist()
+            )
+        ]
 
     @staticmethod
     def to_markers(
@@ -202,23 +315,37 @@ class ReportExporter:
         """
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
-        if format == "csv":
-            lines = ["start,end,label,reason"]
-            for edit in report.edits:
-                # 處理文字中的逗號和換行
-                text = edit.text.replace(",", ";").replace("\n", " ")
-                lines.append(
-                    f"{edit.original_start:.3f},{edit.original_end:.3f},"
-                    f"\"{text}\",{edit.reason}"
+        with output_path.open(
+            "w", encoding="utf-8", newline="", buffering=_WRITE_BUFFER_SIZE
+        ) as f:
+            if format == "csv":
+                # csv 模組負責引號與跳脫，文字中的逗號與引號原樣保留
+                writer = csv.writer(f, lineterminator="\n")
+                writer.writerow(["start", "end", "label", "reason"])
+                writer.writerows(
+                    (
+                        f"{edit.original_start:.3f}",
+                        f"{edit.original_end:.3f}",
+                        edit.text.replace("\n", " "),
+                        edit.reason,
+                    )
+                    for edit in report.edits
+                )
+
+            else:  # txt (Audacity label format)
+                # Audacity 不解析引號，定位字元與換行先替換掉即可不加引號輸出
+                writer = csv.writer(
+                    f, delimiter="\t", lineterminator="\n",
+                    quoting=csv.QUOTE_NONE, quotechar=None
                 )
-            output_path.write_text("\n".join(lines), encoding="utf-8")
-
-        else:  # txt (Audacity label format)
-            lines = []
-            for edit in report.edits:
-                text = edit.text.replace("\t", " ").replace("\n", " ")
-                lines.append(
-                    f"{edit.original_start:.6f}\t{edit.original_end:.6f}\t"
-                    f"[{edit.reason}] {text}"
+                writer.writerows(
+                    (
+                        f"{edit.original_start:.6f}",
+                        f"{edit.original_end:.6f}",
+                        "[{}] {}".format(
+                            edit.reason,
+                            edit.text.replace("\t", " ").replace("\n", " ")
+                        ),
+                    )
+                    for edit in report.edits
                 )
-            output_path.write_text("\n".join(lines), encoding="utf-8")
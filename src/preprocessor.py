@@ -1,9 +1,34 @@
 """音訊預處理器 - 格式標準化與多軌處理"""
 
+import json
+import subprocess
 from pathlib import Path
-from typing import List, Literal
-
-from pydub import AudioSegment
+from typing import List, Literal, Optional
+
+import numpy as np
+import soundfile as sf
+
+# libsndfile 子格式對應的每樣本位元組數
+_SUBTYPE_WIDTHS = {
+    "PCM_S8": 1,
+    "PCM_U8": 1,
+    "PCM_16": 2,
+    "PCM_24": 3,
+    "PCM_32": 4,
+    "FLOAT": 4,
+    "DOUBLE": 8,
+}
+
+# WhisperX 使用的取樣率
+WHISPER_SAMPLE_RATE = 16000
+
+# 樣本寬度（位元組）對應的 WAV PCM 編碼
+_PCM_CODECS = {
+    1: "pcm_u8",
+    2: "pcm_s16le",
+    3: "pcm_s24le",
+    4: "pcm_s32le",
+}
 
 
 class AudioPreprocessor:
@@ -27,7 +52,8 @@ class AudioPreprocessor:
         self,
         input_paths: List[Path],
         output_path: Path,
-        mode: Literal["merge", "first"] = "first"
+        mode: Literal["merge", "first"] = "first",
+        whisper_pcm_path: Optional[Path] = None
     ) -> Path:
         """
         處理音訊檔案
@@ -36,6 +62,8 @@ class AudioPreprocessor:
             input_paths: 輸入音訊路徑列表
             output_path: 輸出路徑
             mode: "merge" 合併所有軌道, "first" 只用第一軌
+            whisper_pcm_path: 若指定，同一次解碼另外輸出
+                16kHz 單聲道 float32 raw PCM 供 WhisperX 直接使用
 
         Returns:
             處理後的音訊路徑
@@ -43,6 +71,7 @@ class AudioPreprocessor:
         Raises:
             ValueError: 若輸入路徑列表為空
             FileNotFoundError: 若輸入檔案不存在
+            RuntimeError: 若 ffmpeg 處理失敗
         """
         if not input_paths:
             raise ValueError("至少需要一個輸入檔案")
@@ -52,117 +81,220 @@ class AudioPreprocessor:
             if not path.exists():
                 raise FileNotFoundError(f"找不到檔案: {path}")
 
-        # 載入音訊
-        audio_segments = [self._load_audio(p) for p in input_paths]
-
-        # 根據模式處理
         if mode == "first":
-            result = self._normalize(audio_segments[0])
+            inputs = input_paths[:1]
         elif mode == "merge":
-            result = self._merge_tracks(audio_segments)
+            inputs = input_paths
         else:
             raise ValueError(f"不支援的模式: {mode}")
 
         # 確保輸出目錄存在
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
-        # 匯出
-        result.export(
-            output_path,
-            format="wav",
-            parameters=["-ar", str(self.sample_rate)]
-        )
+        # 由 ffmpeg 一次完成解碼、重取樣、混音與輸出，不經 Python 處理樣本
+        infos = [self.get_audio_info(p) for p in inputs]
+        command = ["ffmpeg", "-nostdin", "-hide_banner", "-loglevel", "error", "-y"]
+        for path in inputs:
+            command += ["-i", str(path)]
+
+        if whisper_pcm_path is None:
+            filter_graph = self._build_filter(infos, "out")
+        else:
+            # 混音結果分流，一路輸出 WAV，一路轉為 WhisperX 的輸入格式
+            filter_graph = (
+                f"{self._build_filter(infos, 'mix')};"
+                f"[mix]asplit=2[out][pre];"
+                f"[pre]{self._channel_filter(self.channels, 1)}"
+                f"aresample={WHISPER_SAMPLE_RATE},aformat=sample_fmts=flt[whisper]"
+            )
+
+        command += [
+            "-filter_complex", filter_graph,
+            "-map", "[out]",
+            "-c:a", _PCM_CODECS.get(
+                max(info["sample_width"] for info in infos), "pcm_s32le"
+            ),
+            "-f", "wav",
+            str(output_path),
+        ]
+        if whisper_pcm_path is not None:
+            whisper_pcm_path.parent.mkdir(parents=True, exist_ok=True)
+            command += [
+                "-map", "[whisper]",
+                "-c:a", "pcm_f32le",
+                "-f", "f32le",
+                str(whisper_pcm_path),
+            ]
+
+        result = subprocess.run(command, capture_output=True)
+        if result.returncode != 0:
+            message = result.stderr.decode("utf-8", errors="replace").strip()
+            raise RuntimeError(f"ffmpeg 處理失敗: {message}")
 
         return output_path
 
-    def _load_audio(self, path: Path) -> AudioSegment:
-        """載入音訊檔案
+    def process_for_whisper(
+        self,
+        input_paths: List[Path],
+        output_path: Path,
+        pcm_path: Path,
+        mode: Literal["merge", "first"] = "first"
+    ) -> np.ndarray:
+        """
+        處理音訊檔案，並取得可直接交給 WhisperX 的音訊
+
+        WAV 與 16kHz 單聲道 float32 PCM 由同一次 ffmpeg 解碼產生，
+        轉錄時不必再以 whisperx.load_audio 重新解碼 WAV。
 
         Args:
-            path: 音訊檔案路徑
+            input_paths: 輸入音訊路徑列表
+            output_path: WAV 輸出路徑
+            pcm_path: raw PCM 輸出路徑
+            mode: "merge" 合併所有軌道, "first" 只用第一軌
 
         Returns:
-            AudioSegment 物件
+            映射 raw PCM 檔案的 float32 陣列
         """
-        suffix = path.suffix.lower()
-
-        if suffix == ".wav":
-            return AudioSegment.from_wav(str(path))
-        elif suffix == ".mp3":
-            return AudioSegment.from_mp3(str(path))
-        elif suffix == ".flac":
-            return AudioSegment.from_file(str(path), format="flac")
-        elif suffix in [".ogg", ".opus"]:
-            return AudioSegment.from_ogg(str(path))
-        elif suffix == ".m4a":
-            return AudioSegment.from_file(str(path), format="m4a")
-        else:
-            # 嘗試自動偵測格式
-            return AudioSegment.from_file(str(path))
+        self.process(input_paths, output_path, mode, whisper_pcm_path=pcm_path)
+        return self.load_whisper_pcm(pcm_path)
+
+    @staticmethod
+    def load_whisper_pcm(pcm_path: Path) -> np.ndarray:
+        """
+        以記憶體映射載入 16kHz 單聲道 float32 raw PCM
+
+        Args:
+            pcm_path: raw PCM 路徑
+
+        Returns:
+            float32 陣列（copy-on-write，可安全交給 torch.from_numpy）
+        """
+        if pcm_path.stat().st_size == 0:
+            return np.zeros(0, dtype=np.float32)
+        return np.memmap(pcm_path, dtype=np.float32, mode="c")
 
-    def _normalize(self, audio: AudioSegment) -> AudioSegment:
-        """標準化音訊格式
+    def _build_filter(self, infos: List[dict], output_label: str) -> str:
+        """建立標準化與多軌合併的 ffmpeg filter graph
+
+        各軌先轉為目標聲道與取樣率，多軌時再以最長者為準直接相加
+        （不做音量平均），短軌尾端視為靜音。
 
         Args:
-            audio: 輸入音訊
+            infos: 各輸入的音訊資訊
+            output_label: 輸出串流的標籤名稱（不含方括號）
 
         Returns:
-            標準化後的音訊
+            filter_complex 字串
         """
-        return audio.set_frame_rate(self.sample_rate).set_channels(self.channels)
+        chains = [
+            f"[{i}:a:0]{self._channel_filter(info['channels'], self.channels)}"
+            f"aresample={self.sample_rate}"
+            for i, info in enumerate(infos)
+        ]
+        if len(chains) == 1:
+            return f"{chains[0]}[{output_label}]"
+
+        labels = "".join(f"[t{i}]" for i in range(len(chains)))
+        tracks = ";".join(f"{chain}[t{i}]" for i, chain in enumerate(chains))
+        return (
+            f"{tracks};{labels}"
+            f"amix=inputs={len(chains)}:duration=longest:normalize=0[{output_label}]"
+        )
+
+    @staticmethod
+    def _channel_filter(channels: int, target: int) -> str:
+        """建立聲道轉換的 pan filter
 
-    def _merge_tracks(self, tracks: List[AudioSegment]) -> AudioSegment:
-        """合併多個音軌
+        縮混為單聲道時取各聲道平均，單聲道擴展時複製到每個聲道；
+        filter graph 中自動插入的縮混係數為 1/√2，會改變音量，因此明確指定。
 
         Args:
-            tracks: 音軌列表
+            channels: 輸入聲道數
+            target: 目標聲道數
 
         Returns:
-            合併後的音訊
+            pan filter 字串（含結尾逗號），聲道數相同時為空字串
         """
-        if not tracks:
-            raise ValueError("沒有音軌可合併")
-
-        # 先標準化所有軌道
-        normalized = [self._normalize(t) for t in tracks]
-
-        # 找出最長的軌道長度
-        max_length = max(len(t) for t in normalized)
-
-        # 將所有軌道填充到相同長度
-        padded = []
-        for track in normalized:
-            if len(track) < max_length:
-                # 用靜音填充
-                silence = AudioSegment.silent(
-                    duration=max_length - len(track),
-                    frame_rate=self.sample_rate
-                )
-                track = track + silence
-            padded.append(track)
-
-        # 疊加合併
-        result = padded[0]
-        for track in padded[1:]:
-            result = result.overlay(track)
-
-        return result
+        if channels == target:
+            return ""
+
+        layout = {1: "mono", 2: "stereo"}.get(target, f"{target}c")
+        if target == 1:
+            gain = 1.0 / channels
+            mix = "+".join(f"{gain:.6g}*c{c}" for c in range(channels))
+            return f"pan={layout}|c0={mix},"
+        if channels == 1:
+            outputs = "|".join(f"c{c}=c0" for c in range(target))
+            return f"pan={layout}|{outputs},"
+
+        # 其他聲道組合交給 ffmpeg 的標準縮混矩陣
+        return f"aformat=channel_layouts={layout},"
 
     def get_audio_info(self, path: Path) -> dict:
         """取得音訊檔案資訊
 
+        只讀取檔案標頭，不解碼整段音訊。
+
         Args:
             path: 音訊檔案路徑
 
         Returns:
             包含音訊資訊的字典
         """
-        audio = self._load_audio(path)
+        try:
+            info = sf.info(str(path))
+        except RuntimeError:
+            # libsndfile 不支援的格式（m4a、opus 等）改由 ffprobe 讀取
+            return self._probe_audio_info(path)
+
+        return {
+            "path": str(path),
+            "duration_seconds": info.duration,
+            "sample_rate": info.samplerate,
+            "channels": info.channels,
+            "sample_width": _SUBTYPE_WIDTHS.get(info.subtype, 2),
+            "frame_count": info.frames,
+        }
+
+    def _probe_audio_info(self, path: Path) -> dict:
+        """以 ffprobe 讀取音訊檔案資訊
+
+        Args:
+            path: 音訊檔案路徑
+
+        Returns:
+            包含音訊資訊的字典
+        """
+        result = subprocess.run(
+            [
+                "ffprobe", "-v", "quiet",
+                "-print_format", "json",
+                "-select_streams", "a:0",
+                "-show_streams", "-show_format",
+                str(path),
+            ],
+            capture_output=True,
+            check=True,
+        )
+        probe = json.loads(result.stdout)
+        if not probe.get("streams"):
+            raise ValueError(f"找不到音訊串流: {path}")
+
+        stream = probe["streams"][0]
+        duration = float(
+            stream.get("duration") or probe.get("format", {}).get("duration") or 0.0
+        )
+        sample_rate = int(stream["sample_rate"])
+        # 有損格式沒有固定位元深度，與 pydub 解碼結果一致視為 16-bit
+        bits = int(
+            stream.get("bits_per_raw_sample") or stream.get("bits_per_sample") or 16
+        )
+
         return {
             "path": str(path),
-            "duration_seconds": len(audio) / 1000.0,
-            "sample_rate": audio.frame_rate,
-            "channels": audio.channels,
-            "sample_width": audio.sample_width,
-            "frame_count": audio.frame_count(),
+            "duration_seconds": duration,
+            "sample_rate": sample_rate,
+            "channels": int(stream["channels"]),
+            "sample_width": max(bits // 8, 1),
+            "frame_count": int(round(duration * sample_rate)),
         }
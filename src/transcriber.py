@@ -1,15 +1,49 @@
 """WhisperX 轉錄器 - 語音轉文字與說話者分離"""
 
+from concurrent.futures import Future
 from dataclasses import dataclass, field
+from functools import cached_property
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Optional, Union
+import json
 import os
+import threading
 
+import numpy as np
 import torch
 import whisperx
 
+try:
+    import orjson
+except ImportError:  # orjson 為選用相依套件
+    orjson = None
 
-@dataclass
+# CPU 上允許的 int8 量化計算精度
+_CPU_COMPUTE_TYPES = ("int8", "int8_float32")
+
+
+def _run_in_background(fn, *args) -> Future:
+    """在 daemon 執行緒中執行 fn，結果填入 Future
+
+    ThreadPoolExecutor 的工作執行緒會在直譯器結束時被等待，
+    預處理失敗或 Ctrl-C 時就得等模型下載、載入完畢才能離開；
+    daemon 執行緒則不會阻擋程式結束。
+    """
+    future: Future = Future()
+
+    def run():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(fn(*args))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, daemon=True).start()
+    return future
+
+
+@dataclass(slots=True)
 class WordSegment:
     """單詞級別的時間戳"""
     word: str
@@ -29,7 +63,7 @@ class WordSegment:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class Segment:
     """句子級別的段落"""
     text: str
@@ -51,22 +85,44 @@ class Segment:
 
 @dataclass
 class TranscriptResult:
-    """轉錄結果"""
+    """轉錄結果
+
+    轉錄完成後不再修改，to_dict 與 get_full_text 的結果於首次呼叫後快取。
+    """
     segments: List[Segment]
     language: str
     duration: float
 
-    def to_dict(self) -> dict:
-        """轉換為字典"""
+    @cached_property
+    def _dict(self) -> dict:
+        """快取的字典表示（底線開頭，orjson 序列化 dataclass 時會略過）"""
         return {
             "segments": [s.to_dict() for s in self.segments],
             "language": self.language,
             "duration": self.duration,
         }
 
+    @cached_property
+    def _full_text(self) -> str:
+        """快取的完整文字"""
+        return " ".join(s.text for s in self.segments)
+
+    def to_dict(self) -> dict:
+        """轉換為字典（快取的共用物件，請勿修改）"""
+        return self._dict
+
+    def to_json(self) -> bytes:
+        """序列化為 UTF-8 JSON
+
+        有 orjson 時直接序列化 dataclass，不建立中間的字典樹。
+        """
+        if orjson is not None:
+            return orjson.dumps(self)
+        return json.dumps(self.to_dict(), ensure_ascii=False).encode("utf-8")
+
     def get_full_text(self) -> str:
         """取得完整文字"""
-        return " ".join(s.text for s in self.segments)
+        return self._full_text
 
     def get_words(self) -> List[WordSegment]:
         """取得所有單詞"""
@@ -89,19 +145,30 @@ class Transcriber:
         compute_type: str = "float16",
         language: str = "zh",
         hf_token: Optional[str] = None,
-        batch_size: int = 16
+        batch_size: int = 16,
+        prefetch: bool = True,
+        prefetch_diarization: bool = False
     ):
         """
         初始化轉錄器
 
         Args:
             model_size: Whisper 模型大小 (tiny, base, small, medium, large-v2, large-v3)
-            device: 執行裝置 ("cuda" 或 "cpu")
-            compute_type: 計算精度 ("float16", "float32", "int8")
+            device: 執行裝置 ("cuda" 或 "cpu")，無可用 CUDA 時改用 CPU
+            compute_type: 計算精度 ("float16", "float32", "int8")，
+                CPU 上一律使用 int8 量化模型
             language: 語言代碼 (zh, en, ja, etc.)
             hf_token: Hugging Face token (用於 pyannote 說話者分離)
-            batch_size: 批次大小
+            batch_size: 批次大小（CUDA 記憶體不足時自動減半）
+            prefetch: 是否在背景預先載入轉錄與對齊模型（僅 CUDA）
+            prefetch_diarization: 預先載入時是否一併載入說話者分離模型
         """
+        if device == "cuda" and not torch.cuda.is_available():
+            device = "cpu"
+        if device == "cpu" and compute_type not in _CPU_COMPUTE_TYPES:
+            # CTranslate2 在 CPU 上以 int8 內積執行最快，權重記憶體也最小
+            compute_type = "int8"
+
         self.model_size = model_size
         self.device = device
         self.compute_type = compute_type
@@ -114,6 +181,40 @@ class Transcriber:
         self._align_metadata = None
         self._diarize_model = None
 
+        # 在背景載入模型權重，與音訊預處理、載入重疊。
+        # 對齊與說話者分離模型在獨立的 CUDA stream 上傳權重，
+        # 與 Whisper 模型載入及轉錄同時進行
+        self._model_future: Optional[Future] = None
+        self._aux_future: Optional[Future] = None
+        self._aux_stream = None
+        if prefetch and self.device == "cuda":
+            self._aux_stream = torch.cuda.Stream()
+            self._model_future = _run_in_background(self._load_models)
+            self._aux_future = _run_in_background(
+                self._prefetch_aux_models, prefetch_diarization
+            )
+
+    def _prefetch_aux_models(self, diarize: bool):
+        """於輔助 CUDA stream 上載入對齊與說話者分離模型"""
+        with torch.cuda.stream(self._aux_stream):
+            self._load_align_model()
+            # 沒有 token 時留待 transcribe 依原本流程處理
+            if diarize and self.hf_token:
+                self._load_diarize_model()
+
+    def _wait_for_prefetch(self):
+        """等待背景載入 Whisper 模型，載入失敗時拋出原本的例外"""
+        if self._model_future is not None:
+            future, self._model_future = self._model_future, None
+            future.result()
+
+    def _wait_for_aux_models(self):
+        """等待對齊與說話者分離模型，並讓目前的 stream 等待其權重上傳完成"""
+        if self._aux_future is not None:
+            future, self._aux_future = self._aux_future, None
+            future.result()
+            torch.cuda.current_stream().wait_stream(self._aux_stream)
+
     def _load_models(self):
         """延遲載入模型"""
         if self._model is None:
@@ -147,7 +248,7 @@ class Transcriber:
 
     def transcribe(
         self,
-        audio_path: Path,
+        audio: Union[Path, np.ndarray],
         diarize: bool = True,
         min_speakers: Optional[int] = None,
         max_speakers: Optional[int] = None
@@ -156,7 +257,8 @@ class Transcriber:
         執行轉錄
 
         Args:
-            audio_path: 音訊檔案路徑
+            audio: 音訊檔案路徑，或已解碼的 16kHz 單聲道 float32 陣列
+                （例如 AudioPreprocessor.process_for_whisper 的結果）
             diarize: 是否執行說話者分離
             min_speakers: 最少說話者數 (用於 diarization)
             max_speakers: 最多說話者數 (用於 diarization)
@@ -164,26 +266,32 @@ class Transcriber:
         Returns:
             TranscriptResult
         """
+        # 載入音訊（背景預載模型時兩者同時進行），已解碼的陣列直接使用
+        if not isinstance(audio, np.ndarray):
+            audio = whisperx.load_audio(str(audio))
+        duration = len(audio) / 16000  # WhisperX 使用 16kHz
+
         # 載入模型
+        self._wait_for_prefetch()
         self._load_models()
 
-        # 載入音訊
-        audio = whisperx.load_audio(str(audio_path))
-        duration = len(audio) / 16000  # WhisperX 使用 16kHz
-
         # 執行轉錄
-        result = self._model.transcribe(audio, batch_size=self.batch_size)
+        result = self._transcribe_batched(audio)
 
         # 單詞級對齊
+        # 對齊模型逐段切出音訊送進 GPU，先整段上傳一次，各段切片即已在裝置上
+        self._wait_for_aux_models()
         self._load_align_model()
+        device_audio = self._to_device(audio)
         result = whisperx.align(
             result["segments"],
             self._align_model,
             self._align_metadata,
-            audio,
+            device_audio,
             self.device,
             return_char_alignments=False
         )
+        del device_audio
 
         # 說話者分離
         if diarize:
@@ -213,42 +321,70 @@ class Transcriber:
             duration=duration
         )
 
+    def _to_device(self, audio):
+        """將音訊上傳到執行裝置（CPU 時維持 NumPy 陣列）"""
+        if self.device != "cuda":
+            return audio
+        return torch.from_numpy(audio).to(self.device)
+
+    def _transcribe_batched(self, audio) -> dict:
+        """以可容納的最大批次執行轉錄，CUDA 記憶體不足時批次減半重試"""
+        while True:
+            try:
+                return self._model.transcribe(audio, batch_size=self.batch_size)
+            except RuntimeError as e:
+                # CTranslate2 以一般 RuntimeError 回報 CUDA OOM，
+                # torch.cuda.OutOfMemoryError 亦為其子類別
+                if "out of memory" not in str(e).lower() or self.batch_size <= 1:
+                    raise
+                # 保留減半後的批次大小，之後的呼叫不必再重試
+                self.batch_size //= 2
+                torch.cuda.empty_cache()
+
     def _convert_result(self, result: dict) -> List[Segment]:
         """轉換 WhisperX 結果為內部格式"""
-        segments = []
-
-        for seg in result.get("segments", []):
-            words = []
-            for word_data in seg.get("words", []):
-                # 處理可能缺失的時間戳
-                start = word_data.get("start")
-                end = word_data.get("end")
-
-                if start is None or end is None:
-                    continue
-
-                word = WordSegment(
-                    word=word_data.get("word", ""),
-                    start=start,
-                    end=end,
-                    confidence=word_data.get("score", 1.0),
-                    speaker=word_data.get("speaker")
-                )
-                words.append(word)
-
-            segment = Segment(
+        return [
+            Segment(
                 text=seg.get("text", "").strip(),
                 start=seg.get("start", 0.0),
                 end=seg.get("end", 0.0),
                 speaker=seg.get("speaker"),
-                words=words
+                words=self._convert_words(seg.get("words", ()))
             )
-            segments.append(segment)
+            for seg in result.get("segments", ())
+        ]
 
-        return segments
+    @staticmethod
+    def _convert_words(word_list: list) -> List[WordSegment]:
+        """轉換單詞列表，略過沒有時間戳的單詞"""
+        word_segment = WordSegment
+        words = []
+        append = words.append
+
+        for word_data in word_list:
+            # 處理可能缺失的時間戳（無法對齊的數字、符號等）
+            try:
+                start = word_data["start"]
+                end = word_data["end"]
+            except KeyError:
+                continue
+            if start is None or end is None:
+                continue
+
+            append(word_segment(
+                word_data.get("word", ""),
+                start,
+                end,
+                word_data.get("score", 1.0),
+                word_data.get("speaker")
+            ))
+
+        return words
 
     def unload_models(self):
         """釋放模型記憶體"""
+        self._wait_for_prefetch()
+        self._wait_for_aux_models()
         del self._model
         del self._align_model
         del self._diarize_model
@@ -0,0 +1,154 @@
+"""Analyzer 測試"""
+
+import json
+
+import pytest
+
+from src.analyzer import ANALYSIS_PROMPT, Analyzer, _Chunk, _RemovalStreamParser
+from src.transcriber import Segment, TranscriptResult
+
+REMOVALS = [
+    {"start": 1.0, "end": 2.0, "reason": "filler", "text": "嗯 {不是物件} ]"},
+    {"start": 3.5, "end": 4.0, "reason": "repeat", "text": 'he said "}" \\ ok'},
+    {"start": 5.0, "end": 6.0, "reason": "silence", "text": ""},
+]
+
+RESPONSE = (
+    "以下是分析結果：\n```json\n"
+    + json.dumps({"removals": REMOVALS, "note": "{ignored}"}, ensure_ascii=False)
+    + "\n```"
+)
+
+
+def _feed_in_pieces(text, size):
+    parser = _RemovalStreamParser()
+    items = []
+    for i in range(0, len(text), size):
+        items.extend(parser.feed(text[i:i + size]))
+    return parser, items
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, len(RESPONSE)])
+def test_stream_parser_handles_small_pieces(size):
+    """字串內的大括號、方括號與跳脫引號不影響物件切分"""
+    parser, items = _feed_in_pieces(RESPONSE, size)
+    assert parser.found
+    assert items == REMOVALS
+    assert parser.text == RESPONSE
+
+
+def test_stream_parser_yields_objects_as_they_complete():
+    parser = _RemovalStreamParser()
+    first = json.dumps(REMOVALS[0], ensure_ascii=False)
+
+    assert parser.feed('{"remov') == []
+    assert parser.feed('als": [' + first[:-1]) == []
+    assert parser.feed("}, ") == [REMOVALS[0]]
+
+
+def test_stream_parser_without_removals_key():
+    parser, items = _feed_in_pieces('{"result": []}', 2)
+    assert not parser.found
+    assert items == []
+
+
+class _FakeCache:
+    """以固定結果回應 match_many 的快取"""
+
+    def __init__(self, matches):
+        self.matches = matches
+
+    def match_many(self, texts):
+        return self.matches[:len(texts)]
+
+
+def _cache_lookup(match):
+    analyzer = Analyzer(api_key="test")
+    analyzer.cache = _FakeCache([match])
+    segments = [
+        Segment(text="嗯 我們今天來聊聊", start=10.0, end=12.0),
+        Segment(text="那個 快取的設計", start=12.0, end=14.0),
+    ]
+    return analyzer._cache_get_many([_Chunk(segments, "", 0)])[0]
+
+
+def test_cache_hit_shifts_to_chunk_start():
+    """近似命中且文字對得上時採用，時間平移回絕對時間"""
+    items = [{"start": 2.1, "end": 2.4, "reason": "filler", "text": "那個", "confidence": 0.9}]
+    removals = _cache_lookup((items, False))
+    assert [(r.start, r.end, r.text) for r in removals] == [(12.1, 12.4, "那個")]
+
+
+def test_approximate_cache_hit_with_mismatched_text_is_a_miss():
+    items = [{"start": 2.1, "end": 2.4, "reason": "filler", "text": "然後", "confidence": 0.9}]
+    assert _cache_lookup((items, False)) is None
+
+
+def test_approximate_cache_hit_with_wrong_time_is_a_miss():
+    """文字存在但不在該時間範圍內"""
+    items = [{"start": 0.0, "end": 0.5, "reason": "filler", "text": "那個", "confidence": 0.9}]
+    assert _cache_lookup((items, False)) is None
+
+
+def test_empty_cache_hit_requires_exact_match():
+    """沒有移除區間可供驗證時，只接受精確命中"""
+    assert _cache_lookup(([], True)) == []
+    assert _cache_lookup(([], False)) is None
+    assert _cache_lookup(None) is None
+
+
+def _transcript(count, seconds=2.0, text="這是一段測試用的逐字稿內容"):
+    segments = [
+        Segment(text=f"{text}{i}", start=i * seconds, end=(i + 1) * seconds)
+        for i in range(count)
+    ]
+    return TranscriptResult(segments=segments, language="zh", duration=count * seconds)
+
+
+def _assert_covers(chunks, transcript):
+    """chunk 依序涵蓋所有段落，且文字與段落一致"""
+    assert [seg for chunk in chunks for seg in chunk.segments] == transcript.segments
+    for chunk in chunks:
+        assert chunk.segments
+        assert chunk.text.count("\n") == len(chunk.segments) - 1
+
+
+def test_chunk_transcript_respects_token_budget():
+    analyzer = Analyzer(
+        api_key="test",
+        max_segment_duration=10_000,
+        max_tokens_per_request=Analyzer._estimate_tokens(ANALYSIS_PROMPT) + 200,
+    )
+    transcript = _transcript(100)
+
+    chunks = analyzer._chunk_transcript(transcript)
+
+    assert len(chunks) > 1
+    _assert_covers(chunks, transcript)
+    for chunk in chunks:
+        assert chunk.tokens <= analyzer._transcript_budget
+        assert chunk.tokens >= Analyzer._estimate_tokens(chunk.text)
+
+
+def test_chunk_transcript_respects_duration():
+    analyzer = Analyzer(api_key="test", max_segment_duration=30.0)
+    transcript = _transcript(100)
+
+    chunks = analyzer._chunk_transcript(transcript)
+
+    _assert_covers(chunks, transcript)
+    assert [len(chunk.segments) for chunk in chunks] == [15] * 6 + [10]
+
+
+def test_chunk_transcript_keeps_oversized_segment():
+    """單一段落超過額度時自成一個 chunk，不會產生空 chunk"""
+    analyzer = Analyzer(
+        api_key="test",
+        max_tokens_per_request=Analyzer._estimate_tokens(ANALYSIS_PROMPT) + 50,
+    )
+    transcript = _transcript(3, text="很長的段落" * 40)
+
+    chunks = analyzer._chunk_transcript(transcript)
+
+    _assert_covers(chunks, transcript)
+    assert [len(chunk.segments) for chunk in chunks] == [1, 1, 1]
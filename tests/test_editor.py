@@ -0,0 +1,203 @@
+"""Editor 測試"""
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from src.analyzer import AnalysisResult, Removal, removals_to_arrays
+from src.editor import (
+    Editor,
+    _CrossfadeWriter,
+    _equal_power_fade,
+    _nearest_zero_crossing,
+    _zc_kernel,
+)
+
+SAMPLE_RATE = 1000
+
+
+def _tone(frames, channels=2, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.integers(-20000, 20000, size=(frames, channels), dtype=np.int16)
+
+
+def test_concat_with_crossfade_overlaps_each_join():
+    """接點兩側重疊 crossfade 長度，並套用等功率曲線"""
+    editor = Editor(crossfade_ms=10)
+    segments = [_tone(100, seed=1), _tone(80, seed=2), _tone(60, seed=3)]
+
+    out = editor._concat_with_crossfade(segments, SAMPLE_RATE)
+
+    assert out.dtype == np.int16
+    assert len(out) == 100 + 80 + 60 - 2 * 10
+    fade_out, fade_in = _equal_power_fade(10)
+    mixed = segments[0][-10:] * fade_out + segments[1][:10] * fade_in
+    np.testing.assert_array_equal(out[90:100], mixed.astype(np.int16))
+    np.testing.assert_array_equal(out[:90], segments[0][:90])
+    np.testing.assert_array_equal(out[-50:], segments[2][10:])
+
+
+def test_concat_with_crossfade_joins_short_segments_directly():
+    """任一側短於 crossfade 長度時直接連接"""
+    editor = Editor(crossfade_ms=10)
+    segments = [_tone(100, seed=1), _tone(5, seed=2), _tone(60, seed=3)]
+
+    out = editor._concat_with_crossfade(segments, SAMPLE_RATE)
+
+    # 第一個接點直接連接，第二個接點與前段（含短區間）重疊
+    assert len(out) == 100 + 5 + 60 - 10
+    np.testing.assert_array_equal(out[:95], segments[0][:95])
+    np.testing.assert_array_equal(out[-50:], segments[2][10:])
+
+
+class _ListSink:
+    """收集 _CrossfadeWriter 寫出的區塊"""
+
+    def __init__(self):
+        self.blocks = []
+
+    def write(self, block):
+        self.blocks.append(block.copy())
+
+
+@pytest.mark.parametrize("block_size", [1, 7, 64, 1000])
+def test_crossfade_writer_matches_in_memory_concat(block_size):
+    """分塊串流寫出的結果與一次性串接相同（含過短區間）"""
+    editor = Editor(crossfade_ms=10)
+    segments = [_tone(100, seed=1), _tone(5, seed=2), _tone(60, seed=3), _tone(30, seed=4)]
+
+    sink = _ListSink()
+    writer = _CrossfadeWriter(sink, 10)
+    for segment in segments:
+        if writer.can_crossfade(len(segment)):
+            writer.crossfade(segment[:10])
+            segment = segment[10:]
+        for i in range(0, len(segment), block_size):
+            writer.write(segment[i:i + block_size])
+    writer.close()
+
+    expected = editor._concat_with_crossfade(segments, SAMPLE_RATE)
+    np.testing.assert_array_equal(np.concatenate(sink.blocks), expected)
+    assert writer.frames == len(expected)
+
+
+def test_streamed_edit_matches_in_memory_edit(tmp_path, monkeypatch):
+    """libsndfile 串流剪輯與載入整段音訊的剪輯結果一致"""
+    sample_rate = 8000
+    t = np.arange(sample_rate * 3) / sample_rate
+    tone = np.stack([np.sin(2 * np.pi * 220 * t), np.sin(2 * np.pi * 330 * t)], axis=1)
+    audio_path = tmp_path / "episode.wav"
+    sf.write(str(audio_path), (tone * 12000).astype(np.int16), sample_rate, subtype="PCM_16")
+
+    analysis = AnalysisResult(
+        removals=[
+            Removal(0.5, 1.0, "filler", "a"),
+            Removal(1.8, 2.2, "repeat", "b"),
+        ],
+        original_duration=3.0,
+        removed_duration=0.9,
+    )
+    editor = Editor()
+
+    streamed = editor.edit(audio_path, analysis, tmp_path / "streamed.wav")
+    monkeypatch.setattr(Editor, "_open_soundfile", staticmethod(lambda path: None))
+    in_memory = editor.edit(audio_path, analysis, tmp_path / "in_memory.wav")
+
+    a, _ = sf.read(str(tmp_path / "streamed.wav"), dtype="int16")
+    b, _ = sf.read(str(tmp_path / "in_memory.wav"), dtype="int16")
+    assert a.shape == b.shape
+    # 兩條路徑的 crossfade 以不同整數寬度計算，允許 1 LSB 的捨入差異
+    assert np.abs(a.astype(np.int32) - b).max() <= 1
+    assert streamed.edited_duration == pytest.approx(in_memory.edited_duration)
+    assert [e.to_dict() for e in streamed.edits] == [e.to_dict() for e in in_memory.edits]
+
+
+def test_merge_removals_nested_and_overlapping():
+    """包含在前一區間內的區間不會截短群組；間隔小於閾值的區間合併"""
+    editor = Editor(merge_gap_ms=50)
+    removals = [
+        Removal(5.0, 6.0, "repeat", "c"),
+        Removal(1.0, 4.0, "filler", "a", confidence=0.95),
+        Removal(2.0, 3.0, "silence", "b", confidence=0.8),
+        Removal(4.03, 4.5, "filler", "d"),
+        Removal(8.0, 9.0, "tangent", "e"),
+        Removal(8.5, 8.7, "filler", "f"),
+    ]
+
+    merged = editor._merge_removals(removals)
+
+    assert [(r.start, r.end, r.reason, r.text) for r in merged] == [
+        (1.0, 4.5, "filler", "a ... b ... d"),
+        (5.0, 6.0, "repeat", "c"),
+        (8.0, 9.0, "tangent", "e ... f"),
+    ]
+    assert merged[0].confidence == pytest.approx(0.8)
+    # 未合併的區間直接沿用原物件
+    assert merged[1] is removals[0]
+
+
+def test_merge_removals_gap_threshold():
+    editor = Editor(merge_gap_ms=50)
+    merged = editor._merge_removals([
+        Removal(1.0, 2.0, "filler", "a"),
+        Removal(2.06, 3.0, "filler", "b"),
+    ])
+    assert len(merged) == 2
+    assert editor._merge_removals([]) == []
+
+
+def _numpy_zero_crossing(window, offset):
+    """NumPy 版本：所有零交叉點中最接近 offset 者，沒有時取最接近零的點"""
+    crossings = Editor._compute_zero_crossings(window)
+    if len(crossings) > 0:
+        return int(crossings[np.argmin(np.abs(crossings - offset))])
+    return int(np.argmin(np.abs(window)))
+
+
+_KERNELS = [_nearest_zero_crossing] + ([_zc_kernel] if _zc_kernel is not None else [])
+
+
+@pytest.mark.parametrize("kernel", _KERNELS)
+def test_nearest_zero_crossing_matches_numpy(kernel):
+    rng = np.random.default_rng(0)
+    for trial in range(300):
+        n = int(rng.integers(1, 40))
+        if trial % 3 == 0:
+            # 全部同號：沒有零交叉點，退回最接近零的點
+            window = rng.integers(1, 50, size=n).astype(np.int64)
+        else:
+            window = rng.integers(-50, 50, size=n).astype(np.int64)
+        for offset in range(n):
+            assert kernel(window, offset) == _numpy_zero_crossing(window, offset)
+
+
+def test_merge_removals_with_precomputed_arrays():
+    """由欄位陣列合併的結果與由 Removal 列表建立陣列相同，信心值不失真"""
+    editor = Editor(merge_gap_ms=50)
+    removals = [
+        Removal(1.0, 4.0, "filler", "a", confidence=0.1),
+        Removal(2.0, 3.0, "silence", "b", confidence=0.7),
+        Removal(6.0, 7.0, "repeat", "c", confidence=0.3),
+    ]
+    arrays = removals_to_arrays(removals)
+
+    assert arrays["confidence"].dtype == np.float64
+    assert editor._merge_removals(removals, arrays) == editor._merge_removals(removals)
+    assert editor._merge_removals(removals, arrays)[0].confidence == 0.1
+
+
+def test_prepare_removals_filters_short_removals():
+    editor = Editor(min_removal_ms=100, merge_gap_ms=50)
+    analysis = AnalysisResult(
+        removals=[
+            Removal(3.0, 3.05, "filler", "short"),
+            Removal(1.0, 2.0, "filler", "a"),
+            Removal(2.02, 2.5, "repeat", "b"),
+        ],
+        original_duration=10.0,
+        removed_duration=1.55,
+    )
+
+    prepared = editor._prepare_removals(analysis)
+
+    assert [(r.start, r.end, r.text) for r in prepared] == [(1.0, 2.5, "a ... b")]
@@ -0,0 +1,92 @@
+"""ReportExporter 測試"""
+
+import csv
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from src.editor import AppliedEdit, EditReport
+from src.exporter import ReportExporter
+
+NTSC_30 = 30000 / 1001
+
+
+def _report(edits, duration=10.0):
+    return EditReport(
+        input_path=Path("episode.wav"),
+        output_path=Path("episode_edited.wav"),
+        original_duration=duration,
+        edited_duration=duration,
+        edits=edits,
+    )
+
+
+@pytest.mark.parametrize("frame, expected", [
+    (0, "00:00:00;00"),
+    (1799, "00:00:59;29"),
+    (1800, "00:01:00;02"),
+    (17981, "00:09:59;29"),
+    (17982, "00:10:00;00"),
+    (107892, "01:00:00;00"),
+])
+def test_drop_frame_timecode(frame, expected):
+    """29.97 使用 SMPTE drop-frame 編號"""
+    assert ReportExporter._seconds_to_timecode(frame / NTSC_30, NTSC_30) == expected
+
+
+def test_batch_timecodes_match_scalar():
+    """批次換算與逐一換算結果一致"""
+    frames = np.array([0, 1799, 1800, 17982, 107892])
+    seconds = frames / NTSC_30
+    assert ReportExporter._seconds_to_timecodes(seconds, NTSC_30) == [
+        ReportExporter._seconds_to_timecode(s, NTSC_30) for s in seconds
+    ]
+
+
+@pytest.mark.parametrize("seconds, fps, expected", [
+    (3600.0, 30.0, "01:00:00:00"),
+    (0.7, 30.0, "00:00:00:21"),
+    (1.5, 25.0, "00:00:01:13"),
+    (3600.0, 24000 / 1001, "00:59:56:10"),
+])
+def test_non_drop_frame_timecode(seconds, fps, expected):
+    """整數影格率與 23.976 以名義影格率計數"""
+    assert ReportExporter._seconds_to_timecode(seconds, fps) == expected
+
+
+def test_keep_regions_with_nested_edit():
+    """包在前一個編輯內的編輯不會產生多餘的保留區間"""
+    report = _report([
+        AppliedEdit(1.0, 5.0, "filler", "a"),
+        AppliedEdit(2.0, 3.0, "filler", "b"),
+        AppliedEdit(6.0, 7.0, "repeat", "c"),
+    ])
+    assert ReportExporter._compute_keep_regions(report) == [
+        (0.0, 1.0), (5.0, 6.0), (7.0, 10.0)
+    ]
+
+
+def test_keep_regions_without_edits():
+    assert ReportExporter._compute_keep_regions(_report([])) == [(0.0, 10.0)]
+
+
+def test_edl_header_reports_drop_frame(tmp_path):
+    path = tmp_path / "episode.edl"
+    ReportExporter.to_edl(_report([AppliedEdit(1.0, 2.0, "filler", "a")]), path, fps=NTSC_30)
+    assert path.read_text(encoding="utf-8").splitlines()[1] == "FCM: DROP FRAME"
+
+
+def test_csv_markers_keep_quotes_and_commas(tmp_path):
+    """標籤中的引號與逗號經 csv 跳脫後可原樣讀回"""
+    text = 'he said "hi", then left'
+    path = tmp_path / "markers.csv"
+    ReportExporter.to_markers(_report([AppliedEdit(1.0, 2.5, "filler", text)]), path)
+
+    with path.open(encoding="utf-8", newline="") as f:
+        rows = list(csv.reader(f))
+
+    assert rows == [
+        ["start", "end", "label", "reason"],
+        ["1.000", "2.500", text, "filler"],
+    ]